@@ -12,6 +12,11 @@ import app.models.course  # importe todos os modelos aqui
 import app.models.event  # importe todos os modelos aqui
 import app.models.document_author  # importe todos os modelos aqui
 import app.models.document_keyword  # importe todos os modelos aqui
+import app.models.keyword  # importe todos os modelos aqui
+import app.models.upload_session  # importe todos os modelos aqui
+import app.models.storage_outbox  # importe todos os modelos aqui
+import app.models.document_similarity  # importe todos os modelos aqui
+import app.models.similarity_queue  # importe todos os modelos aqui
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,29 @@
+"""add documents file_url index
+
+Revision ID: 0f5a8d3c7e21
+Revises: b6d20f7e9c14
+Create Date: 2026-10-18 19:02:51.127845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f5a8d3c7e21'
+down_revision: Union[str, Sequence[str], None] = 'b6d20f7e9c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # busca em lote dos arquivos referenciados (coletor de objetos órfãos)
+    op.create_index('ix_documents_file_url', 'documents', ['file_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_file_url', table_name='documents')
@@ -0,0 +1,60 @@
+"""add search_vector to documents
+
+Revision ID: 4b1d7e9a2c31
+Revises: 26a3e83bbb04
+Create Date: 2026-10-18 10:12:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1d7e9a2c31'
+down_revision: Union[str, Sequence[str], None] = '26a3e83bbb04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_CONFIGS = {
+    'pt_unaccent': ('portuguese', 'portuguese_stem'),
+    'en_unaccent': ('english', 'english_stem'),
+}
+
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('{config}', {source}), '{weight}')"
+    for source, weight in (
+        ("coalesce(d.title, '')", 'A'),
+        ("coalesce((SELECT string_agg(k.keyword, ' ') FROM document_keywords k WHERE k.document_id = d.id), '')", 'A'),
+        ("coalesce((SELECT string_agg(a.name, ' ') FROM document_authors a WHERE a.document_id = d.id), '')", 'B'),
+        ("coalesce(d.field, '')", 'B'),
+        ("coalesce(d.abstract, '')", 'C'),
+    )
+    for config in SEARCH_CONFIGS
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    for config, (parent, stemmer) in SEARCH_CONFIGS.items():
+        op.execute(f"CREATE TEXT SEARCH CONFIGURATION {config} (COPY = {parent})")
+        op.execute(
+            f"ALTER TEXT SEARCH CONFIGURATION {config} "
+            f"ALTER MAPPING FOR hword, hword_part, word WITH unaccent, {stemmer}"
+        )
+
+    op.add_column('documents', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"UPDATE documents AS d SET search_vector = {SEARCH_VECTOR_SQL}")
+    op.create_index('ix_documents_search_vector', 'documents', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_search_vector', table_name='documents', postgresql_using='gin')
+    op.drop_column('documents', 'search_vector')
+    for config in SEARCH_CONFIGS:
+        op.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {config}")
@@ -0,0 +1,88 @@
+"""create keywords table
+
+Revision ID: 5c7e2a94f0b8
+Revises: d3a8f61b7e42
+Create Date: 2026-10-18 14:41:09.336175
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e2a94f0b8'
+down_revision: Union[str, Sequence[str], None] = 'd3a8f61b7e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalize_keyword(keyword: str) -> str:
+    # cópia de app.utils.normalize_keyword na data desta migração: o backfill precisa
+    # gerar exatamente as formas que a aplicação gera (o unaccent do Postgres não gera)
+    keyword = unicodedata.normalize('NFKD', keyword)
+    keyword = ''.join(c for c in keyword if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', keyword).strip().lower()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('keywords',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('normalized', sa.String(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('normalized')
+    )
+    op.add_column('document_keywords', sa.Column('keyword_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('document_keywords_keyword_id_fkey', 'document_keywords', 'keywords', ['keyword_id'], ['id'])
+    op.create_index(op.f('ix_document_keywords_keyword_id'), 'document_keywords', ['keyword_id'], unique=False)
+
+    # vocabulário a partir das keywords já cadastradas (primeira grafia em ordem alfabética),
+    # normalizado em Python com a mesma função da aplicação
+    bind = op.get_bind()
+    spellings = bind.execute(sa.text("SELECT DISTINCT keyword FROM document_keywords")).scalars().all()
+    by_normalized: dict[str, list[str]] = {}
+    for keyword in spellings:
+        normalized = normalize_keyword(keyword)
+        if normalized:
+            by_normalized.setdefault(normalized, []).append(keyword)
+
+    keywords_table = sa.table('keywords', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                              sa.column('normalized', sa.String), sa.column('document_count', sa.Integer))
+    ids = {}
+    for normalized, group in sorted(by_normalized.items()):
+        ids[normalized] = bind.execute(
+            keywords_table.insert()
+            .values(name=min(group).strip(), normalized=normalized, document_count=0)
+            .returning(keywords_table.c.id)
+        ).scalar_one()
+
+    links = [
+        {"keyword": keyword, "keyword_id": ids[normalized]}
+        for normalized, group in by_normalized.items()
+        for keyword in group
+    ]
+    if links:
+        bind.execute(
+            sa.text("UPDATE document_keywords SET keyword_id = :keyword_id WHERE keyword = :keyword"),
+            links,
+        )
+
+    op.execute("""
+        UPDATE keywords SET document_count = (
+            SELECT count(DISTINCT dk.document_id) FROM document_keywords dk WHERE dk.keyword_id = keywords.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_keywords_keyword_id'), table_name='document_keywords')
+    op.drop_constraint('document_keywords_keyword_id_fkey', 'document_keywords', type_='foreignkey')
+    op.drop_column('document_keywords', 'keyword_id')
+    op.drop_table('keywords')
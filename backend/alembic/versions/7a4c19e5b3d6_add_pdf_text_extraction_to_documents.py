@@ -0,0 +1,42 @@
+"""add pdf text extraction to documents
+
+Revision ID: 7a4c19e5b3d6
+Revises: 5c7e2a94f0b8
+Create Date: 2026-10-18 16:12:30.418522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c19e5b3d6'
+down_revision: Union[str, Sequence[str], None] = '5c7e2a94f0b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('full_text', sa.Text(), nullable=True))
+    # documentos existentes entram na fila como pendentes
+    op.add_column('documents', sa.Column('text_status', sa.String(), server_default='pending', nullable=False))
+    op.add_column('documents', sa.Column('text_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('documents', sa.Column('text_error', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('text_next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index(
+        'ix_documents_text_queue', 'documents', ['text_next_attempt_at'], unique=False,
+        postgresql_where=sa.text("text_status IN ('pending', 'processing')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_text_queue', table_name='documents')
+    op.drop_column('documents', 'text_next_attempt_at')
+    op.drop_column('documents', 'text_error')
+    op.drop_column('documents', 'text_attempts')
+    op.drop_column('documents', 'text_status')
+    op.drop_column('documents', 'full_text')
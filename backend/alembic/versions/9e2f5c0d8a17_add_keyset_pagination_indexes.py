@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: 9e2f5c0d8a17
+Revises: 4b1d7e9a2c31
+Create Date: 2026-10-18 11:03:47.552901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2f5c0d8a17'
+down_revision: Union[str, Sequence[str], None] = '4b1d7e9a2c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_documents_publish_year_id', 'documents', ['publish_year', 'id'], unique=False)
+    op.create_index('ix_documents_advisor_id_publish_year_id', 'documents', ['advisor_id', 'publish_year', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_advisor_id_publish_year_id', table_name='documents')
+    op.drop_index('ix_documents_publish_year_id', table_name='documents')
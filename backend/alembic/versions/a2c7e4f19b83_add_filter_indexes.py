@@ -0,0 +1,56 @@
+"""add filter indexes
+
+Revision ID: a2c7e4f19b83
+Revises: 0f5a8d3c7e21
+Create Date: 2026-10-18 19:40:06.583214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c7e4f19b83'
+down_revision: Union[str, Sequence[str], None] = '0f5a8d3c7e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # filtros de igualdade já na ordem da listagem (publish_year DESC, id DESC)
+    op.create_index('ix_documents_type_publish_year_id', 'documents', ['type', 'publish_year', 'id'], unique=False)
+    op.create_index('ix_documents_event_id_publish_year_id', 'documents', ['event_id', 'publish_year', 'id'], unique=False)
+    op.create_index('ix_documents_course_id', 'documents', ['course_id'], unique=False)
+
+    # chaves estrangeiras das coleções (selectinload e EXISTS dos filtros)
+    op.create_index('ix_document_authors_document_id', 'document_authors', ['document_id'], unique=False)
+    op.create_index('ix_document_keywords_document_id', 'document_keywords', ['document_id'], unique=False)
+
+    # ILIKE '%...%' (área, keyword e nome de autor)
+    op.create_index('ix_documents_field_trgm', 'documents', ['field'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'field': 'gin_trgm_ops'})
+    op.create_index('ix_document_keywords_keyword_trgm', 'document_keywords', ['keyword'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'keyword': 'gin_trgm_ops'})
+    op.create_index('ix_document_authors_name_trgm', 'document_authors', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+    op.execute("ANALYZE documents")
+    op.execute("ANALYZE document_authors")
+    op.execute("ANALYZE document_keywords")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_authors_name_trgm', table_name='document_authors')
+    op.drop_index('ix_document_keywords_keyword_trgm', table_name='document_keywords')
+    op.drop_index('ix_documents_field_trgm', table_name='documents')
+    op.drop_index('ix_document_keywords_document_id', table_name='document_keywords')
+    op.drop_index('ix_document_authors_document_id', table_name='document_authors')
+    op.drop_index('ix_documents_course_id', table_name='documents')
+    op.drop_index('ix_documents_event_id_publish_year_id', table_name='documents')
+    op.drop_index('ix_documents_type_publish_year_id', table_name='documents')
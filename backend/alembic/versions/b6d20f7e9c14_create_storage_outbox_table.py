@@ -0,0 +1,38 @@
+"""create storage outbox table
+
+Revision ID: b6d20f7e9c14
+Revises: e81f3b6c2a95
+Create Date: 2026-10-18 18:22:14.660930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d20f7e9c14'
+down_revision: Union[str, Sequence[str], None] = 'e81f3b6c2a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('storage_outbox',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('object_name', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_storage_outbox_next_attempt_at'), 'storage_outbox', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_storage_outbox_next_attempt_at'), table_name='storage_outbox')
+    op.drop_table('storage_outbox')
@@ -0,0 +1,28 @@
+"""add aborted to upload sessions
+
+Revision ID: b7e4c2a9d5f3
+Revises: f2d9b4c8e6a1
+Create Date: 2026-10-19 10:12:05.734918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c2a9d5f3'
+down_revision: Union[str, Sequence[str], None] = 'f2d9b4c8e6a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('upload_sessions', sa.Column('aborted', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('upload_sessions', 'aborted')
@@ -0,0 +1,50 @@
+"""create document similarities
+
+Revision ID: d4b8e2a6f3c1
+Revises: a2c7e4f19b83
+Create Date: 2026-10-18 20:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e2a6f3c1'
+down_revision: Union[str, Sequence[str], None] = 'a2c7e4f19b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_similarities',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('similar_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id', 'similar_id')
+    )
+    op.create_index('ix_document_similarities_document_id_score', 'document_similarities', ['document_id', 'score'], unique=False)
+    op.create_index('ix_document_similarities_similar_id', 'document_similarities', ['similar_id'], unique=False)
+
+    op.create_table('similarity_queue',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # o acervo existente é calculado de uma vez pelo atualizador (NULL = recalcular tudo)
+    op.execute("INSERT INTO similarity_queue (document_id) VALUES (NULL)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('similarity_queue')
+    op.drop_index('ix_document_similarities_similar_id', table_name='document_similarities')
+    op.drop_index('ix_document_similarities_document_id_score', table_name='document_similarities')
+    op.drop_table('document_similarities')
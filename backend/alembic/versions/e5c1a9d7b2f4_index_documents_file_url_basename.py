@@ -0,0 +1,31 @@
+"""index documents file_url basename
+
+Revision ID: e5c1a9d7b2f4
+Revises: d4b8e2a6f3c1
+Create Date: 2026-10-18 21:05:42.903517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c1a9d7b2f4'
+down_revision: Union[str, Sequence[str], None] = 'd4b8e2a6f3c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # o coletor de órfãos compara pelo nome do objeto, não pela URL inteira (que muda com o host)
+    op.execute("CREATE INDEX ix_documents_file_url_basename ON documents (regexp_replace(file_url, '^.*/', ''))")
+    op.drop_index('ix_documents_file_url', table_name='documents')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_documents_file_url', 'documents', ['file_url'], unique=False)
+    op.drop_index('ix_documents_file_url_basename', table_name='documents')
@@ -0,0 +1,32 @@
+"""presigned upload sessions
+
+Revision ID: e81f3b6c2a95
+Revises: 7a4c19e5b3d6
+Create Date: 2026-10-18 17:05:48.201377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81f3b6c2a95'
+down_revision: Union[str, Sequence[str], None] = '7a4c19e5b3d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # envio direto ao MinIO (URL pré-assinada) não tem multipart upload
+    op.alter_column('upload_sessions', 'upload_id', existing_type=sa.String(), nullable=True)
+    op.create_index(op.f('ix_upload_sessions_object_name'), 'upload_sessions', ['object_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_sessions_object_name'), table_name='upload_sessions')
+    op.execute("DELETE FROM upload_sessions WHERE upload_id IS NULL")
+    op.alter_column('upload_sessions', 'upload_id', existing_type=sa.String(), nullable=False)
@@ -0,0 +1,34 @@
+"""upload sessions chunk_size bigint
+
+Revision ID: f2d9b4c8e6a1
+Revises: e5c1a9d7b2f4
+Create Date: 2026-10-18 22:14:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d9b4c8e6a1'
+down_revision: Union[str, Sequence[str], None] = 'e5c1a9d7b2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # no envio pré-assinado chunk_size = size, que passa de 2 GiB com UPLOAD_MAX_SIZE maior
+    op.alter_column('upload_sessions', 'chunk_size', existing_type=sa.Integer(), type_=sa.BigInteger(),
+                    existing_nullable=False)
+    # a limpeza das sessões vencidas filtra por created_at
+    op.create_index(op.f('ix_upload_sessions_created_at'), 'upload_sessions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_sessions_created_at'), table_name='upload_sessions')
+    op.alter_column('upload_sessions', 'chunk_size', existing_type=sa.BigInteger(), type_=sa.Integer(),
+                    existing_nullable=False)
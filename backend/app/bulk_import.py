@@ -0,0 +1,353 @@
+"""
+Importação em lote de documentos (JSONL, CSV ou BibTeX).
+
+Os arquivos são lidos linha a linha e inseridos em lotes (executemany), então a memória
+usada não depende do tamanho do arquivo. Linhas inválidas entram no relatório de erros
+sem interromper o restante da importação.
+
+Uso pela linha de comando:
+
+    python -m app.bulk_import documentos.jsonl
+    python -m app.bulk_import documentos.bib --format bibtex --batch-size 500
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.crud.document import invalidate_document_caches
+from app.crud.keyword import refresh_keyword_counts, resolve_keywords
+from app.keyword_index import keyword_index
+from app.models.document import Document
+from app.models.document_author import DocumentAuthor
+from app.models.document_keyword import DocumentKeyword
+from app.schemas.document import DocumentCreate
+from app.search import refresh_search_vectors
+from app.similarity import enqueue_similarity_update
+from app.utils import normalize_keyword
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("jsonl", "csv", "bibtex")
+
+_BIBTEX_FIELD = re.compile(r"\s*,?\s*([A-Za-z][\w-]*)\s*=\s*")
+
+DOCUMENT_FIELDS = (
+    "title", "abstract", "type", "field", "publish_year", "event_id", "course_id",
+    "advisor_id", "advisor_name", "advisor_email", "file_url",
+)
+
+
+class RowError(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Parsers: geradores de (número da linha/registro, dict | RowError)
+# ---------------------------------------------------------------------------
+
+def parse_jsonl(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, RowError(f"JSON inválido: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield number, RowError("cada linha deve ser um objeto JSON")
+            continue
+        yield number, row
+
+
+def _split_authors(value: str) -> list[dict]:
+    """'Nome <email>; Outro Nome' -> [{"name": ..., "email": ...}, ...]"""
+    authors = []
+    for part in value.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.match(r"^(.*?)\s*<([^>]*)>$", part)
+        if match:
+            authors.append({"name": match.group(1).strip(), "email": match.group(2).strip() or None})
+        else:
+            authors.append({"name": part, "email": None})
+    return authors
+
+
+def parse_csv(lines):
+    """
+    Colunas iguais aos campos de DocumentCreate; `authors` no formato "Nome <email>; Nome"
+    e `keywords` separadas por ";".
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        number = reader.line_num
+        row = {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key}
+        row["authors"] = _split_authors(row.get("authors") or "")
+        row["keywords"] = [k.strip() for k in (row.get("keywords") or "").split(";") if k.strip()]
+        yield number, row
+
+
+def _parse_bibtex_fields(body: str) -> dict:
+    """Lê pares `campo = {valor}` / `"valor"` / número de uma entrada BibTeX."""
+    fields = {}
+    i, size = 0, len(body)
+    while i < size:
+        match = _BIBTEX_FIELD.match(body, i)
+        if not match:
+            break
+        name = match.group(1).lower()
+        i = match.end()
+        if i >= size:
+            break
+
+        if body[i] == "{":
+            depth, start = 1, i + 1
+            i += 1
+            while i < size and depth:
+                if body[i] == "{":
+                    depth += 1
+                elif body[i] == "}":
+                    depth -= 1
+                i += 1
+            value = body[start:i - 1]
+        elif body[i] == '"':
+            start = i + 1
+            i += 1
+            while i < size and body[i] != '"':
+                i += 1
+            value = body[start:i]
+            i += 1
+        else:
+            start = i
+            while i < size and body[i] not in ",}":
+                i += 1
+            value = body[start:i]
+
+        fields[name] = re.sub(r"\s+", " ", value.replace("{", "").replace("}", "")).strip()
+    return fields
+
+
+def _bibtex_entry_to_row(entry_type: str, fields: dict) -> dict:
+    return {
+        "title": fields.get("title"),
+        "abstract": fields.get("abstract"),
+        "type": fields.get("type") or entry_type,
+        "field": fields.get("field"),
+        "publish_year": fields.get("year"),
+        "event_id": fields.get("event_id"),
+        "course_id": fields.get("course_id"),
+        "advisor_id": fields.get("advisor_id"),
+        "advisor_name": fields.get("advisor"),
+        "file_url": fields.get("file_url") or fields.get("url"),
+        "authors": [{"name": name.strip()} for name in fields.get("author", "").split(" and ") if name.strip()],
+        "keywords": [k.strip() for k in re.split(r"[,;]", fields.get("keywords", "")) if k.strip()],
+    }
+
+
+def parse_bibtex(lines):
+    """Lê entradas @tipo{chave, campo = valor, ...} acumulando linhas até fechar as chaves."""
+    buffer, depth, start_line = [], 0, 0
+    for number, line in enumerate(lines, start=1):
+        if not buffer:
+            stripped = line.lstrip()
+            if not stripped.startswith("@"):
+                continue
+            start_line = number
+
+        buffer.append(line)
+        depth += line.count("{") - line.count("}")
+        if depth > 0:
+            continue
+
+        entry = "".join(buffer).strip()
+        buffer, depth = [], 0
+
+        match = re.match(r"@(\w+)\s*\{\s*[^,]*,(.*)\}\s*$", entry, re.DOTALL)
+        if not match:
+            yield start_line, RowError("entrada BibTeX inválida")
+            continue
+        entry_type = match.group(1).lower()
+        if entry_type in ("comment", "preamble", "string"):
+            continue
+        yield start_line, _bibtex_entry_to_row(entry_type, _parse_bibtex_fields(match.group(2)))
+
+    if buffer:
+        yield start_line, RowError("entrada BibTeX não terminada")
+
+
+PARSERS = {"jsonl": parse_jsonl, "csv": parse_csv, "bibtex": parse_bibtex}
+
+
+# ---------------------------------------------------------------------------
+# Inserção em lotes
+# ---------------------------------------------------------------------------
+
+def _validate(row: dict) -> DocumentCreate:
+    # strings vazias (CSV/BibTeX) contam como campo não informado
+    row = {key: value for key, value in row.items() if value not in ("", None)}
+    return DocumentCreate(**row)
+
+
+def _insert_batch(db: Session, documents: list[DocumentCreate]) -> tuple[list[int], list[int]]:
+    """Insere documentos, autores e keywords do lote. Retorna (ids, ids de keywords tocadas)."""
+    document_ids = db.execute(
+        insert(Document).returning(Document.id, sort_by_parameter_order=True),
+        [{name: getattr(document, name) for name in DOCUMENT_FIELDS} for document in documents],
+    ).scalars().all()
+
+    authors = [
+        {"document_id": document_id, "name": author.name, "email": author.email}
+        for document_id, document in zip(document_ids, documents)
+        for author in document.authors
+    ]
+    if authors:
+        db.execute(insert(DocumentAuthor), authors)
+
+    vocabulary = resolve_keywords(db, [kw for document in documents for kw in document.keywords])
+    keywords = []
+    for document_id, document in zip(document_ids, documents):
+        seen = set()
+        for kw in document.keywords:
+            normalized = normalize_keyword(kw)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                keywords.append({
+                    "document_id": document_id,
+                    "keyword": kw.strip(),
+                    "keyword_id": vocabulary[normalized].id,
+                })
+    if keywords:
+        db.execute(insert(DocumentKeyword), keywords)
+
+    refresh_search_vectors(db, document_ids)
+    enqueue_similarity_update(db, document_ids)
+    return document_ids, [k["keyword_id"] for k in keywords]
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+        self.failed = 0
+
+    def add_error(self, row: int, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _flush_batch(db: Session, batch: list[tuple[int, DocumentCreate]], report: ImportReport) -> list:
+    """Grava o lote numa transação; se o banco recusar, refaz linha a linha para apontar o erro."""
+    documents = [document for _, document in batch]
+    try:
+        _, keyword_ids = _insert_batch(db, documents)
+        updated_keywords = refresh_keyword_counts(db, keyword_ids)
+        db.commit()
+        report.inserted += len(documents)
+        return updated_keywords
+    except SQLAlchemyError:
+        db.rollback()
+
+    keyword_ids = []
+    for number, document in batch:
+        savepoint = db.begin_nested()
+        try:
+            _, ids = _insert_batch(db, [document])
+            savepoint.commit()
+            keyword_ids += ids
+            report.inserted += 1
+        except SQLAlchemyError as e:
+            savepoint.rollback()
+            report.add_error(number, [str(getattr(e, "orig", e)).strip()])
+    updated_keywords = refresh_keyword_counts(db, keyword_ids)
+    db.commit()
+    return updated_keywords
+
+
+def import_documents(db: Session, lines, format: str, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """Valida e insere os registros de `lines` (iterável de linhas de texto) em lotes."""
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        keyword_index.upsert(_flush_batch(db, batch, report))
+        batch.clear()
+
+    try:
+        for number, row in PARSERS[format](lines):
+            if isinstance(row, RowError):
+                report.add_error(number, [str(row)])
+                continue
+            try:
+                batch.append((number, _validate(row)))
+            except ValidationError as e:
+                report.add_error(number, [
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()
+                ])
+                continue
+
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+    finally:
+        if report.inserted:
+            invalidate_document_caches()
+
+    return report.as_dict()
+
+
+def guess_format(filename: str | None) -> str | None:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".bib": "bibtex"}.get(extension)
+
+
+def open_text(binary_file):
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401 (registra todos os modelos)
+
+    parser = argparse.ArgumentParser(description="Importa documentos em lote (JSONL, CSV ou BibTeX)")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    format = args.format or guess_format(args.path)
+    if not format:
+        parser.error("não foi possível deduzir o formato; use --format")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as binary_file:
+            report = import_documents(db, open_text(binary_file), format, args.batch_size)
+    finally:
+        db.close()
+
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    sys.exit(1 if report["failed"] else 0)
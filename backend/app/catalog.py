@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.cache import TTLCache
+
+# Dados de referência (eventos, cursos, keywords) mudam poucas vezes por mês:
+# ficam em memória até uma escrita invalidar (o TTL só limita a defasagem entre processos).
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "3600"))
+
+_catalog_cache = TTLCache(maxsize=32, ttl=CATALOG_CACHE_TTL)
+_generation = {}
+
+
+async def catalog_response(request: Request, key: str, loader, schema) -> Response:
+    """
+    Resposta JSON em cache com ETag forte; devolve 304 quando o cliente já tem a versão atual.
+    `loader` é uma função async chamada apenas quando não há cache.
+    """
+    entry = _catalog_cache.get(key)
+    if entry is None:
+        generation = _generation.get(key, 0)
+        items = await loader()
+        body = json.dumps(
+            jsonable_encoder([schema.model_validate(item) for item in items]),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        entry = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        # não guarda se houve invalidação enquanto a consulta rodava
+        if _generation.get(key, 0) == generation:
+            _catalog_cache.set(key, entry)
+
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_catalog(key: str):
+    _generation[key] = _generation.get(key, 0) + 1
+    _catalog_cache.pop(key)
@@ -1,7 +1,15 @@
+import hashlib
+import itertools
+import os
+import time
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from jose import jwt, JWTError
+from sqlalchemy import event
 
+from app.cache import TTLCache
 from app.core.security import SECRET_KEY, ALGORITHM
 from app.models.user import User
 from app.database import get_db
@@ -9,22 +17,98 @@ from sqlalchemy.orm import Session
 
 bearer_scheme = HTTPBearer()
 
-def get_current_user(credentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
-    
-    token = credentials.credentials
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+
+# token (hash) -> payload já verificado; usuário (sub) -> CurrentUser
+_token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# incrementado a cada invalidação: uma leitura do banco que começou antes dela não vai para o cache
+_invalidations = itertools.count(1)
+_generation = 0
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Usuário autenticado: cópia imutável das colunas, compartilhada entre requisições pelo cache."""
+    id: int
+    email: str
+    name: str | None
+    course_id: int | None
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, email=user.email, name=user.name, course_id=user.course_id)
+
+
+def _decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    # nunca mantém em cache além da expiração do token
+    ttl = AUTH_CACHE_TTL
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        _token_cache.set(key, payload, ttl)
+    return payload
 
-    except JWTError:
+
+def invalidate_user(user_id: int):
+    global _generation
+    _generation = next(_invalidations)
+    _user_cache.pop(str(user_id))
+
+
+# a invalidação acontece no commit (no flush a alteração ainda pode ser desfeita, e outra
+# requisição recolocaria a linha antiga no cache); os ids ficam em session.info até lá
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
+def get_current_user(credentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> CurrentUser:
+
+    token = credentials.credentials
+    payload = _decode_token(token)
+    user_id = payload.get("sub")
+
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _user_cache.get(str(user_id))
+    if user is not None:
+        return user
 
-    if not user:
+    generation = _generation
+    row = db.query(User).filter(User.id == user_id).first()
+
+    if not row:
         raise HTTPException(status_code=401, detail="User not found")
-    
+
+    user = CurrentUser.from_model(row)
+    if generation == _generation:
+        _user_cache.set(str(user_id), user)
+
     return user
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# O bcrypt libera o GIL durante o hash, então threads dedicadas já rodam em paralelo
+# sem o custo de serializar argumentos para outro processo.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+
+class HashingOverloaded(Exception):
+    """Fila de hashing cheia (ou espera excedida): a requisição deve ser recusada com 503."""
+
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+async def run_hash_job(fn, *args):
+    """
+    Executa `fn` no pool de hashing e aguarda o resultado sem ocupar thread: as rotas que
+    chamam isto são async, então a espera não prende o threadpool das rotas síncronas.
+    Levanta HashingOverloaded quando já há PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE
+    tarefas em andamento, em vez de deixar a fila crescer sem limite.
+    """
+    if not _slots.acquire(blocking=False):
+        raise HashingOverloaded()
+
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        # shield: o timeout só desiste de esperar; o hash já submetido termina e libera o slot
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), PASSWORD_HASH_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HashingOverloaded()
+
+
+def benchmark(workers: int, duration: float) -> dict:
+    """Mede hashes/s com `workers` threads usando o CryptContext configurado."""
+    from app.core.security import hash_password
+
+    done = [0] * workers
+    deadline = time.perf_counter() + duration
+
+    def loop(index):
+        while time.perf_counter() < deadline:
+            hash_password("benchmark-password")
+            done[index] += 1
+
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(done) / elapsed
+    return {"workers": workers, "hashes_per_sec": round(total, 2), "per_worker": round(total / workers, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do hashing de senhas (bcrypt)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for workers in range(1, args.max_workers + 1):
+        result = benchmark(workers, args.duration)
+        print(f"{result['workers']:>3} workers: {result['hashes_per_sec']:>8} hashes/s ({result['per_worker']} por worker)")
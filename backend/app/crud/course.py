@@ -1,4 +1,7 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.catalog import invalidate_catalog
 from app.models.course import Course
 from app.schemas.course import CourseCreate
 
@@ -11,8 +14,10 @@ def create_course(db: Session, data: CourseCreate):
     new_course = Course(name=data.name)
     db.add(new_course)
     db.commit()
+    invalidate_catalog("course")
     db.refresh(new_course)
     return new_course
 
-def get_all_courses(db: Session):
-    return db.query(Course).all()
+async def get_all_courses(db: AsyncSession):
+    result = await db.execute(select(Course))
+    return result.scalars().all()
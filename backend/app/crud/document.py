@@ -0,0 +1,291 @@
+import base64
+import json
+import os
+from typing import List
+
+from fastapi import Query
+from sqlalchemy import func, or_, text, tuple_, literal, select, cast, String, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.cache import TTLCache
+from app.catalog import invalidate_catalog
+from app.models.document import Document
+from app.models.document_keyword import DocumentKeyword
+from app.models.document_similarity import DocumentSimilarity
+from app.models.keyword import Keyword
+from app.search import search_query, search_filter, search_rank
+
+# Contagens exatas por conjunto de filtros (invalidadas em qualquer escrita de documento)
+_count_cache = TTLCache(maxsize=1024, ttl=float(os.getenv("DOCUMENT_COUNT_CACHE_TTL", "60")))
+_facet_cache = TTLCache(maxsize=512, ttl=float(os.getenv("DOCUMENT_FACET_CACHE_TTL", "300")))
+
+FACET_KEYWORD_LIMIT = 100
+
+# Coleções em lote (selectin: 1 consulta por coleção, sem multiplicar linhas) e
+# relações to-one por join. Evita o produto cartesiano autores x keywords.
+DOCUMENT_LOAD_OPTIONS = (
+    selectinload(Document.authors),
+    selectinload(Document.keywords),
+    joinedload(Document.advisor),
+    joinedload(Document.course),
+    joinedload(Document.event),
+)
+
+
+class DocumentFilters:
+    """Filtros de documentos recebidos via query params (suporta múltiplos valores)."""
+
+    def __init__(
+        self,
+        q: str | None = None,
+        type: List[str] = Query(default=[]),
+        publish_year: List[int] = Query(default=[]),
+        field: List[str] = Query(default=[]),
+        keyword: List[str] = Query(default=[]),
+        event_id: List[int] = Query(default=[]),
+    ):
+        self.q = q
+        self.type = type
+        self.publish_year = publish_year
+        self.field = field
+        self.keyword = keyword
+        self.event_id = event_id
+        self.tsquery = search_query(q) if q else None
+
+    def apply(self, query):
+        if self.tsquery is not None:
+            # busca textual indexada (título, resumo, área, autores e keywords)
+            query = query.filter(search_filter(self.tsquery))
+
+        if self.type:
+            query = query.filter(Document.type.in_(self.type))
+
+        if self.publish_year:
+            query = query.filter(Document.publish_year.in_(self.publish_year))
+
+        if self.field:
+            # Para múltiplos campos, usa OR entre eles
+            query = query.filter(or_(*[Document.field.ilike(f"%{f}%") for f in self.field]))
+
+        if self.keyword:
+            # Para múltiplas keywords, usa OR entre elas (EXISTS, sem multiplicar linhas)
+            keyword_filters = [DocumentKeyword.keyword.ilike(f"%{k}%") for k in self.keyword]
+            query = query.filter(Document.keywords.any(or_(*keyword_filters)))
+
+        if self.event_id:
+            query = query.filter(Document.event_id.in_(self.event_id))
+
+        return query
+
+    def sort_key(self):
+        """Chave de ordenação: relevância quando há busca textual, senão ano de publicação."""
+        if self.tsquery is not None:
+            return search_rank(self.tsquery)
+        return Document.publish_year
+
+    def is_empty(self) -> bool:
+        return not (self.q or self.type or self.publish_year or self.field or self.keyword or self.event_id)
+
+    def signature(self) -> tuple:
+        return (
+            self.q,
+            tuple(sorted(self.type)),
+            tuple(sorted(self.publish_year)),
+            tuple(sorted(self.field)),
+            tuple(sorted(self.keyword)),
+            tuple(sorted(self.event_id)),
+        )
+
+
+def encode_cursor(key, document_id: int) -> str:
+    raw = json.dumps([key, document_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Retorna (chave, id) do cursor; levanta ValueError se o token for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, document_id = json.loads(raw)
+    except Exception as e:
+        raise ValueError("cursor inválido") from e
+    if not isinstance(document_id, int) or not isinstance(key, (int, float)):
+        raise ValueError("cursor inválido")
+    return key, document_id
+
+
+def page_statement(statement, sort_key, limit: int | None, offset: int = 0, after: str | None = None):
+    """Acrescenta ao statement a ordenação por (sort_key, id) decrescente e a paginação."""
+    statement = statement.add_columns(sort_key).order_by(sort_key.desc(), Document.id.desc())
+
+    if after:
+        key, last_id = decode_cursor(after)
+        statement = statement.where(tuple_(sort_key, Document.id) < tuple_(literal(key), literal(last_id)))
+    elif offset:
+        statement = statement.offset(offset)
+
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def paginate_documents(
+    db: AsyncSession, statement, sort_key, limit: int | None, offset: int = 0, after: str | None = None
+):
+    """
+    Ordena por (sort_key, id) decrescente e pagina por offset ou por cursor (keyset).
+    Retorna (documentos, próximo cursor ou None).
+    """
+    statement = page_statement(statement, sort_key, limit, offset, after)
+    rows = (await db.execute(statement)).all()
+    documents = [row[0] for row in rows]
+
+    next_cursor = None
+    if limit is not None and len(rows) == limit:
+        last_document, last_key = rows[-1]
+        next_cursor = encode_cursor(last_key, last_document.id)
+
+    return documents, next_cursor
+
+
+async def count_documents(db: AsyncSession, filters: DocumentFilters, mode: str) -> int:
+    """Total de documentos para os filtros: "exact" (em cache) ou "estimate" (planner)."""
+    if mode == "estimate":
+        estimate = await db.run_sync(_estimate_count, filters)
+        if estimate is not None:
+            return estimate
+
+    key = filters.signature()
+    total = _count_cache.get(key)
+    if total is None:
+        total = await db.scalar(filters.apply(select(func.count(Document.id))))
+        _count_cache.set(key, total)
+    return total
+
+
+def _estimate_count(db: Session, filters: DocumentFilters) -> int | None:
+    if filters.is_empty():
+        # estatística mantida pelo autovacuum; -1 quando a tabela nunca foi analisada
+        reltuples = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'documents'::regclass")
+        ).scalar()
+        return reltuples if reltuples is not None and reltuples >= 0 else None
+
+    plan = explain(db, filters.apply(db.query(Document.id)).statement)
+    return int(plan["Plan Rows"])
+
+
+def explain(db: Session, statement) -> dict:
+    """Plano estimado (EXPLAIN em JSON) do statement, sem executá-lo. Retorna o nó raiz."""
+    connection = db.connection()
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    if dialect.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def get_document_facets(db: AsyncSession, filters: DocumentFilters) -> dict:
+    """
+    Contagens por type, publish_year, field, event_id e keyword para os filtros atuais,
+    calculadas numa única consulta (CTE + UNION ALL) e guardadas em cache.
+    """
+    key = filters.signature()
+    facets = _facet_cache.get(key)
+    if facets is not None:
+        return facets
+
+    matched = filters.apply(select(Document.id)).cte("matched")
+
+    def document_facet(name, column):
+        return (
+            select(literal(name).label("facet"), cast(column, String).label("value"), func.count().label("count"))
+            .select_from(Document)
+            .join(matched, matched.c.id == Document.id)
+            .where(column.isnot(None))
+            .group_by(column)
+        )
+
+    # agrupa pelo vocabulário normalizado ("Machine Learning" == "machine learning")
+    keyword_facet = (
+        select(
+            literal("keyword").label("facet"),
+            Keyword.name.label("value"),
+            func.count(func.distinct(DocumentKeyword.document_id)).label("count"),
+        )
+        .select_from(DocumentKeyword)
+        .join(Keyword, Keyword.id == DocumentKeyword.keyword_id)
+        .join(matched, matched.c.id == DocumentKeyword.document_id)
+        .group_by(Keyword.id, Keyword.name)
+    )
+
+    statement = union_all(
+        document_facet("type", Document.type),
+        document_facet("publish_year", Document.publish_year),
+        document_facet("field", Document.field),
+        document_facet("event_id", Document.event_id),
+        keyword_facet,
+    )
+
+    facets = {"type": [], "publish_year": [], "field": [], "event_id": [], "keyword": []}
+    for facet, value, count in await db.execute(statement):
+        if facet in ("publish_year", "event_id"):
+            value = int(value)
+        facets[facet].append({"value": value, "count": count})
+
+    for name, counts in facets.items():
+        counts.sort(key=lambda c: (-c["count"], str(c["value"])))
+    facets["keyword"] = facets["keyword"][:FACET_KEYWORD_LIMIT]
+
+    _facet_cache.set(key, facets)
+    return facets
+
+
+async def get_documents_by_ids(db: AsyncSession, ids: list[int]) -> tuple[list[Document], list[int]]:
+    """
+    Busca vários documentos em um número fixo de consultas (1 principal + 1 por coleção).
+    Retorna (documentos na ordem pedida, ids não encontrados).
+    """
+    ids = list(dict.fromkeys(ids))  # remove repetidos mantendo a ordem
+    if not ids:
+        return [], []
+
+    result = await db.execute(
+        select(Document).options(*DOCUMENT_LOAD_OPTIONS).where(Document.id.in_(ids))
+    )
+    found = {document.id: document for document in result.scalars().all()}
+
+    documents = [found[document_id] for document_id in ids if document_id in found]
+    missing = [document_id for document_id in ids if document_id not in found]
+    return documents, missing
+
+
+async def get_similar_documents(db: AsyncSession, document_id: int, limit: int) -> list[Document] | None:
+    """Vizinhos pré-calculados (app/similarity.py), do mais ao menos parecido; None se o documento não existe."""
+    result = await db.execute(
+        select(Document).options(*DOCUMENT_LOAD_OPTIONS)
+        .join(DocumentSimilarity, DocumentSimilarity.similar_id == Document.id)
+        .where(DocumentSimilarity.document_id == document_id)
+        .order_by(DocumentSimilarity.score.desc())
+        .limit(limit)
+    )
+    documents = result.scalars().all()
+    if not documents:
+        exists = await db.execute(select(Document.id).where(Document.id == document_id))
+        if exists.scalar_one_or_none() is None:
+            return None
+    return documents
+
+
+def invalidate_document_caches():
+    """Chamar após qualquer escrita em documentos, autores ou keywords."""
+    _count_cache.clear()
+    _facet_cache.clear()
+    invalidate_catalog("keywords")
@@ -1,4 +1,7 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.catalog import invalidate_catalog
 from app.models.event import Event
 from app.schemas.event import EventCreate
 
@@ -14,8 +17,10 @@ def create_event(db: Session, data: EventCreate):
     )
     db.add(new_event)
     db.commit()
+    invalidate_catalog("event")
     db.refresh(new_event)
     return new_event
 
-def get_all_events(db: Session):
-    return db.query(Event).all()
+async def get_all_events(db: AsyncSession):
+    result = await db.execute(select(Event))
+    return result.scalars().all()
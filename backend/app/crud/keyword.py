@@ -0,0 +1,63 @@
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.document_keyword import DocumentKeyword
+from app.models.keyword import Keyword
+from app.utils import normalize_keyword
+
+
+def resolve_keywords(db: Session, names: list[str]) -> dict[str, Keyword]:
+    """Retorna {normalizada: Keyword} para os nomes informados, criando as que não existem."""
+    new_keywords = {}
+    for name in names:
+        normalized = normalize_keyword(name)
+        if normalized and normalized not in new_keywords:
+            new_keywords[normalized] = name.strip()
+
+    if not new_keywords:
+        return {}
+
+    db.execute(
+        insert(Keyword)
+        .values([
+            {"name": name, "normalized": normalized, "document_count": 0}
+            for normalized, name in new_keywords.items()
+        ])
+        .on_conflict_do_nothing(index_elements=["normalized"])
+    )
+    keywords = db.query(Keyword).filter(Keyword.normalized.in_(list(new_keywords))).all()
+    return {keyword.normalized: keyword for keyword in keywords}
+
+
+def build_document_keywords(db: Session, names: list[str]) -> list[DocumentKeyword]:
+    """Cria as linhas DocumentKeyword de um documento, vinculadas ao vocabulário (sem repetir)."""
+    keywords = resolve_keywords(db, names)
+    document_keywords = []
+    seen = set()
+    for name in names:
+        normalized = normalize_keyword(name)
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        document_keywords.append(DocumentKeyword(keyword=name.strip(), keyword_id=keywords[normalized].id))
+    return document_keywords
+
+
+def refresh_keyword_counts(db: Session, keyword_ids) -> list:
+    """Recalcula document_count das keywords informadas; retorna (id, name, normalized, document_count)."""
+    keyword_ids = [keyword_id for keyword_id in set(keyword_ids) if keyword_id is not None]
+    if not keyword_ids:
+        return []
+
+    result = db.execute(
+        text("""
+            UPDATE keywords SET document_count = (
+                SELECT count(DISTINCT dk.document_id) FROM document_keywords dk WHERE dk.keyword_id = keywords.id
+            )
+            WHERE id = ANY(:ids)
+            RETURNING id, name, normalized, document_count
+        """),
+        {"ids": keyword_ids},
+    )
+    return result.all()
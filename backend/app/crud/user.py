@@ -1,31 +1,39 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password, verify_and_update_password
+from app.core.hashing import run_hash_job
 
-def create_user(db: Session, data: UserCreate):
+async def create_user(db: AsyncSession, data: UserCreate):
     # verify if course already exists
-    existing = db.query(User).filter(User.email == data.email).first()
+    existing = (await db.execute(select(User).where(User.email == data.email))).scalar_one_or_none()
     if existing:
         return None
     
     new_user = User(
         name=data.name,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await run_hash_job(hash_password, data.password),
         course_id=data.course_id
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
     if not user:
         return None
     
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await run_hash_job(verify_and_update_password, password, user.password_hash)
+    if not valid:
         return None
+
+    # custo do bcrypt mudou: atualiza o hash de forma transparente
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     
     return user
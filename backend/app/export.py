@@ -0,0 +1,77 @@
+import csv
+import io
+import os
+
+from sqlalchemy import select
+
+from app.crud.document import DOCUMENT_LOAD_OPTIONS, DocumentFilters
+from app.database import AsyncSessionLocal
+from app.models.document import Document
+from app.schemas.document import DocumentResponse
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+CSV_COLUMNS = (
+    "id", "title", "abstract", "type", "field", "publish_year", "event", "course",
+    "advisor", "authors", "keywords", "file_url",
+)
+
+
+async def iter_documents(filters: DocumentFilters):
+    """
+    Percorre os documentos filtrados com cursor no servidor (yield_per), carregando
+    autores/keywords por lote (selectin). A memória usada é a de um lote, qualquer que
+    seja o tamanho do acervo.
+
+    Abre a própria sessão: a resposta em streaming continua depois que a rota retorna.
+    """
+    statement = filters.apply(
+        select(Document).options(*DOCUMENT_LOAD_OPTIONS)
+    ).order_by(Document.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement)
+        async for partition in result.scalars().partitions():
+            for document in partition:
+                yield DocumentResponse.model_validate(document)
+            # libera o lote já enviado do identity map
+            db.expunge_all()
+
+
+async def export_ndjson(filters: DocumentFilters):
+    async for document in iter_documents(filters):
+        yield document.model_dump_json() + "\n"
+
+
+async def export_csv(filters: DocumentFilters):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    async for document in iter_documents(filters):
+        writer.writerow((
+            document.id,
+            document.title,
+            document.abstract or "",
+            document.type,
+            document.field or "",
+            document.publish_year,
+            document.event.code if document.event else "",
+            document.course.name if document.course else "",
+            document.advisor.name if document.advisor else (document.advisor_name or ""),
+            "; ".join(
+                f"{author.name} <{author.email}>" if author.email else author.name
+                for author in document.authors
+            ),
+            "; ".join(keyword.keyword for keyword in document.keywords),
+            document.file_url,
+        ))
+        yield flush()
@@ -0,0 +1,335 @@
+"""
+Cache em disco, limitado por tamanho (LRU), dos arquivos servidos por /files.
+
+Cada entrada é identificada pelo nome do objeto e pelo ETag do MinIO, então um arquivo
+substituído nunca é servido com o conteúdo antigo.
+
+Fora do cache, o arquivo é baixado do MinIO uma única vez, por uma thread própria, para um
+arquivo temporário; a requisição que provocou o download e as que chegarem enquanto ele
+corre (GET completo ou Range) leem esse arquivo à medida que ele cresce, sem esperar o fim
+e sem depender de nenhum cliente continuar conectado. Se o download falhar ou parar, cada
+leitor busca o restante direto no MinIO. Sem vaga para um novo download
+(FILE_CACHE_FILL_WORKERS) ou para arquivos grandes demais, a resposta vem direto do MinIO.
+
+Os acertos são servidos a partir de um arquivo já aberto (se a entrada for removida por
+LRU ou invalidação durante o envio, o conteúdo continua legível), com sendfile quando o
+servidor ASGI oferece a extensão http.response.zerocopysend.
+
+O índice fica em memória e é reconstruído a partir do diretório na inicialização. Cada
+processo controla o próprio limite: com vários workers do uvicorn, use diretórios
+distintos (FILE_CACHE_DIR) ou divida FILE_CACHE_MAX_BYTES entre eles.
+"""
+import hashlib
+import os
+import tempfile
+import logging
+import threading
+from collections import OrderedDict
+
+import anyio
+from starlette.responses import Response
+
+from app.cache import TTLCache
+from app.metrics import register_collector
+from app.minio_client import client, BUCKET
+from app.storage import STREAM_CHUNK_SIZE, iter_object
+
+FILE_CACHE_DIR = os.getenv("FILE_CACHE_DIR", "/tmp/file-cache")
+FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# arquivos maiores que isso continuam indo direto do MinIO
+FILE_CACHE_MAX_OBJECT_BYTES = int(os.getenv("FILE_CACHE_MAX_OBJECT_BYTES", str(64 * 1024 * 1024)))
+# o ETag vem de um stat no MinIO; guardá-lo por alguns segundos evita a ida ao MinIO nos acertos
+FILE_CACHE_STAT_TTL = float(os.getenv("FILE_CACHE_STAT_TTL", "30"))
+# downloads simultâneos para o cache; sem vaga, a requisição lê direto do MinIO
+FILE_CACHE_FILL_WORKERS = int(os.getenv("FILE_CACHE_FILL_WORKERS", "8"))
+# segundos sem progresso no download até os leitores desistirem dele
+FILE_CACHE_FILL_STALL = float(os.getenv("FILE_CACHE_FILL_STALL", "30"))
+
+_TEMP_PREFIX = ".fill-"
+
+logger = logging.getLogger(__name__)
+
+
+def _name_hash(object_name: str) -> str:
+    return hashlib.sha256(object_name.encode()).hexdigest()[:32]
+
+
+class _Fill:
+    """Download em andamento para um arquivo temporário; os leitores acompanham o que já foi gravado."""
+
+    def __init__(self, temp_path: str, size: int):
+        self.temp_path = temp_path
+        self.size = size
+        self.written = 0
+        self.done = False
+        self._condition = threading.Condition()
+
+    def advance(self, written: int):
+        with self._condition:
+            self.written = written
+            self._condition.notify_all()
+
+    def finish(self):
+        with self._condition:
+            self.done = True
+            self._condition.notify_all()
+
+    def wait(self, position: int) -> int:
+        """Espera haver bytes além de `position`; retorna até onde dá para ler, ou -1 se o download falhou ou parou."""
+        with self._condition:
+            while self.written <= position and not self.done:
+                if not self._condition.wait(FILE_CACHE_FILL_STALL):
+                    break
+            return self.written if self.written > position else -1
+
+
+class FileCache:
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int, fill_workers: int = FILE_CACHE_FILL_WORKERS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.enabled = bool(directory) and max_bytes > 0
+        self._entries: OrderedDict[str, int] = OrderedDict()  # arquivo -> tamanho, do menos recente ao mais recente
+        self._size = 0
+        self._lock = threading.Lock()
+        self._fills: dict[str, _Fill] = {}  # arquivo -> download em andamento
+        self._fill_slots = threading.BoundedSemaphore(max(fill_workers, 1))
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "fills": 0, "fill_errors": 0, "evictions": 0, "invalidations": 0}
+        if self.enabled:
+            self._load()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.startswith(_TEMP_PREFIX):
+                os.remove(entry.path)  # download interrompido
+                continue
+            stat = entry.stat()
+            files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _filename(self, object_name: str, etag: str) -> str:
+        return f"{_name_hash(object_name)}-{etag}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def _evict(self):
+        # chamar com o lock
+        while self._size > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def open(self, object_name: str, etag: str):
+        """Arquivo em cache já aberto para leitura (o chamador fecha), ou None."""
+        if not self.enabled:
+            return None
+        name = self._filename(object_name, etag)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+            # aberto com o lock: _evict e invalidate não removem o arquivo entre a busca e o open
+            try:
+                fileobj = open(path, "rb")
+            except FileNotFoundError:
+                self._size -= self._entries.pop(name, 0)
+                return None
+            self.stats["hits"] += 1
+        # atualiza o mtime para a ordem LRU sobreviver a um reinício
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return fileobj
+
+    def stream(self, object_name: str, etag: str, size: int, offset: int = 0, length: int | None = None):
+        """
+        Blocos de um arquivo fora do cache (chamar depois de open() devolver None): lidos do
+        download em andamento, iniciado aqui se preciso, ou direto do MinIO quando o arquivo
+        não vai para o cache.
+        """
+        length = size - offset if length is None else length
+        with self._lock:
+            self.stats["misses"] += 1
+        joined = self._join_fill(object_name, etag, size)
+        if joined is None:
+            return iter_object(object_name, offset=offset, length=length) if length else iter(())
+        fill, fileobj = joined
+        return self._read_behind(fill, fileobj, object_name, offset, offset + length)
+
+    def _join_fill(self, object_name: str, etag: str, size: int):
+        """(download, arquivo temporário aberto) do objeto, começando o download se preciso; ou None."""
+        if not self.enabled or size > self.max_object_bytes:
+            return None
+        name = self._filename(object_name, etag)
+        with self._lock:
+            fill = self._fills.get(name)
+            if fill is not None:
+                # aberto com o lock: _finish_fill não renomeia nem apaga o temporário entre a busca e o open
+                self.stats["coalesced"] += 1
+                return fill, open(fill.temp_path, "rb")
+            if name in self._entries or not self._fill_slots.acquire(blocking=False):
+                return None  # acabou de entrar no cache (raro) ou não há vaga para outro download
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=self.directory)
+                fileobj = open(temp_path, "rb")
+            except OSError:
+                self._fill_slots.release()
+                logger.exception("erro ao criar o arquivo temporário do cache em disco")
+                return None
+            fill = self._fills[name] = _Fill(temp_path, size)
+        threading.Thread(
+            target=self._fill, args=(object_name, name, fill, fd), name="file-cache-fill", daemon=True
+        ).start()
+        return fill, fileobj
+
+    def _fill(self, object_name: str, name: str, fill: _Fill, fd: int):
+        written = 0
+        try:
+            with os.fdopen(fd, "wb", buffering=0) as output:
+                # o objeto inteiro (length=0), mesmo para arquivos vazios
+                for chunk in iter_object(object_name):
+                    written += output.write(chunk)
+                    fill.advance(written)
+            if written != fill.size:
+                raise IOError(f"{written} bytes gravados, {fill.size} esperados")
+            self._finish_fill(name, fill)
+        except Exception:
+            self._count("fill_errors")
+            logger.exception("erro ao preencher o cache em disco com %s", object_name)
+            self._discard_fill(name, fill)
+        finally:
+            fill.finish()
+            self._fill_slots.release()
+
+    def _finish_fill(self, name: str, fill: _Fill):
+        with self._lock:
+            # os leitores já têm o temporário aberto; os próximos encontram a entrada pronta
+            os.replace(fill.temp_path, os.path.join(self.directory, name))
+            del self._fills[name]
+            self._size += fill.size - self._entries.pop(name, 0)
+            self._entries[name] = fill.size
+            self.stats["fills"] += 1
+            self._evict()
+
+    def _discard_fill(self, name: str, fill: _Fill):
+        # quem já abriu o temporário continua lendo o que foi gravado
+        with self._lock:
+            self._fills.pop(name, None)
+            try:
+                os.unlink(fill.temp_path)
+            except FileNotFoundError:
+                pass
+
+    def _read_behind(self, fill: _Fill, fileobj, object_name: str, position: int, end: int):
+        with fileobj:
+            while position < end:
+                available = fill.wait(position)
+                if available < 0:
+                    # o download falhou ou parou: o restante vem direto do MinIO
+                    yield from iter_object(object_name, offset=position, length=end - position)
+                    return
+                chunk = os.pread(fileobj.fileno(), min(STREAM_CHUNK_SIZE, available - position, end - position), position)
+                position += len(chunk)
+                yield chunk
+
+    def invalidate(self, object_name: str):
+        """Remove todas as versões do objeto (chamar quando ele é apagado ou substituído)."""
+        _stat_cache.pop(object_name)
+        if not self.enabled:
+            return
+        prefix = f"{_name_hash(object_name)}-"
+        with self._lock:
+            names = [name for name in self._entries if name.startswith(prefix)]
+            for name in names:
+                self._size -= self._entries.pop(name)
+                self.stats["invalidations"] += 1
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+class CachedFileResponse(Response):
+    """
+    Envia `length` bytes a partir de `offset` de um arquivo já aberto, e o fecha. Usa
+    sendfile (extensão ASGI http.response.zerocopysend) quando o servidor oferece; senão,
+    lê em blocos com pread numa thread.
+    """
+
+    def __init__(self, fileobj, offset: int, length: int, status_code: int = 200,
+                 headers: dict | None = None, media_type: str | None = None):
+        self.fileobj = fileobj
+        self.offset = offset
+        self.length = length
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": self.fileobj,
+                    "offset": self.offset,
+                    "count": self.length,
+                })
+                return
+
+            fd = self.fileobj.fileno()
+            position, end = self.offset, self.offset + self.length
+            while position < end:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(STREAM_CHUNK_SIZE, end - position), position)
+                if not chunk:
+                    break  # arquivo menor que o esperado: encerra a resposta
+                position += len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            self.fileobj.close()
+
+
+_stat_cache = TTLCache(maxsize=10000, ttl=FILE_CACHE_STAT_TTL)
+
+
+def stat_object(object_name: str):
+    """stat_object do MinIO com cache curto (o ETag é o que garante a versão certa no disco)."""
+    stat = _stat_cache.get(object_name)
+    if stat is None:
+        stat = client.stat_object(BUCKET, object_name)
+        if FILE_CACHE_STAT_TTL > 0:
+            _stat_cache.set(object_name, stat)
+    return stat
+
+
+file_cache = FileCache(FILE_CACHE_DIR, FILE_CACHE_MAX_BYTES, FILE_CACHE_MAX_OBJECT_BYTES)
+
+
+@register_collector
+def _file_cache_metrics() -> list[str]:
+    snapshot = file_cache.snapshot()
+    lines = []
+    for counter in ("hits", "misses", "coalesced", "fills", "fill_errors", "evictions", "invalidations"):
+        lines += [f"# TYPE file_cache_{counter}_total counter", f"file_cache_{counter}_total {snapshot[counter]}"]
+    for gauge in ("entries", "bytes", "max_bytes"):
+        lines += [f"# TYPE file_cache_{gauge} gauge", f"file_cache_{gauge} {snapshot[gauge]}"]
+    return lines
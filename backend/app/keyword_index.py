@@ -0,0 +1,89 @@
+import bisect
+import heapq
+import itertools
+import threading
+
+from app.utils import normalize_keyword
+
+
+class KeywordPrefixIndex:
+    """
+    Índice em memória para autocomplete de keywords: lista ordenada das formas normalizadas,
+    consultada com bisect (O(log n) para achar o intervalo do prefixo).
+    Atualizado de forma incremental a cada escrita; carregado do banco na primeira consulta.
+
+    As escritas feitas enquanto a carga lê o banco ficam guardadas e são aplicadas por cima
+    do que foi lido, para que uma contagem nova não se perca se a leitura viu a antiga.
+    Cargas simultâneas têm cada uma o seu registro; só a primeira a terminar é aplicada.
+    """
+
+    MAX_SCAN = 5000  # limite de candidatos examinados para prefixos muito curtos
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._entries: dict[str, tuple[int, str, int]] = {}  # normalizada -> (id, nome, contagem)
+        self._lock = threading.Lock()
+        self._loads: dict[int, dict[str, tuple[int, str, int]]] = {}  # carga -> escritas desde o início
+        self._next_load = itertools.count(1)
+        self.loaded = False
+
+    def begin_load(self) -> int:
+        """Chamar antes de ler o vocabulário do banco; o token vai para load() e end_load()."""
+        with self._lock:
+            token = next(self._next_load)
+            self._loads[token] = {}
+            return token
+
+    def load(self, keywords, token: int | None = None):
+        entries = {k.normalized: (k.id, k.name, k.document_count) for k in keywords}
+        with self._lock:
+            pending = self._loads.pop(token, {})
+            if self.loaded and token is not None:
+                return  # outra carga terminou antes; as escritas seguintes já foram aplicadas nela
+            entries.update(pending)
+            self._entries = entries
+            self._keys = sorted(entries)
+            self.loaded = True
+            self._loads.clear()
+
+    def end_load(self, token: int):
+        """Descarta o registro da carga (chamar também quando a leitura falha)."""
+        with self._lock:
+            self._loads.pop(token, None)
+
+    def upsert(self, keywords):
+        with self._lock:
+            if not self.loaded:
+                for pending in self._loads.values():
+                    pending.update((k.normalized, (k.id, k.name, k.document_count)) for k in keywords)
+                return
+            for k in keywords:
+                if k.normalized not in self._entries:
+                    bisect.insort(self._keys, k.normalized)
+                self._entries[k.normalized] = (k.id, k.name, k.document_count)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        prefix = normalize_keyword(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            start = bisect.bisect_left(self._keys, prefix)
+            candidates = []
+            for index in range(start, min(start + self.MAX_SCAN, len(self._keys))):
+                key = self._keys[index]
+                if not key.startswith(prefix):
+                    break
+                keyword_id, name, count = self._entries[key]
+                if count > 0:
+                    candidates.append((count, key, keyword_id, name))
+
+        # mais usadas primeiro; empate em ordem alfabética
+        best = heapq.nsmallest(limit, candidates, key=lambda c: (-c[0], c[1]))
+        return [
+            {"id": keyword_id, "keyword": name, "document_count": count}
+            for count, _, keyword_id, name in best
+        ]
+
+
+keyword_index = KeywordPrefixIndex()
@@ -1,29 +1,52 @@
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException # type: ignore
-from fastapi.responses import StreamingResponse
-from app.minio_client import client, BUCKET
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Request, Response # type: ignore
+from fastapi.responses import RedirectResponse, StreamingResponse
+from app.minio_client import client, BUCKET, STORAGE_DIRECT_MODE
 import uuid
 import os
-import io
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.schemas.course import CourseCreate, CourseResponse
 from app.crud.course import create_course, get_all_courses
 
 from app.schemas.user import UserCreate, UserResponse
 from app.crud.user import create_user
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.hashing import HashingOverloaded
+from app.core.auth import CurrentUser, get_current_user
 from app.routes.auth import router as auth_router   # importa seu router
 from app.routes.document import router as document_router   # importa seu router
+from app.routes.upload import router as upload_router
+from app.routes.admin import router as admin_router
 
 from app.schemas.event import EventCreate, EventResponse
 from app.crud.event import create_event, get_all_events
 
-from app.models.document_keyword import DocumentKeyword
-from app.schemas.keyword import KeywordResponse
+from app.models.keyword import Keyword
+from app.schemas.keyword import KeywordSummaryResponse
+from app.keyword_index import keyword_index
 
 from app.utils import get_public_url, slugify_filename
+from app.catalog import catalog_response
+from app.profiling import ProfilingMiddleware, instrument_serialization
+from app.text_extraction import text_extraction_pool
+from app.thumbnails import schedule_thumbnail
+from app.file_cache import CachedFileResponse, file_cache, stat_object
+from app.storage_outbox import outbox_drainer
+from app.similarity import similarity_updater
+from app.upload_sweeper import upload_sweeper
+from app.storage import (
+    PRESIGNED_URL_EXPIRES,
+    UPLOAD_MAX_SIZE,
+    RangeNotSatisfiable,
+    content_type_for,
+    is_missing_object,
+    is_not_modified,
+    object_headers,
+    parse_range,
+    presigned_get_url,
+)
 
 import app.models 
 
@@ -38,32 +61,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # headers de paginação lidos pelo frontend
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Type"],
 )
 
+# Server-Timing, log por requisição e histogramas de /metrics (fica por fora do CORS)
+instrument_serialization()
+app.add_middleware(ProfilingMiddleware)
+
 
 # registra o router de login
 app.include_router(auth_router)
 app.include_router(document_router)
+app.include_router(upload_router)
+app.include_router(admin_router)
+
+
+@app.on_event("startup")
+def start_background_workers():
+    text_extraction_pool.start()
+    outbox_drainer.start()
+    similarity_updater.start()
+    upload_sweeper.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    text_extraction_pool.stop(timeout=5)
+    outbox_drainer.stop(timeout=5)
+    similarity_updater.stop(timeout=5)
+    upload_sweeper.stop(timeout=5)
+
 
 @app.get("/")
 def read_root():
     return {"message": "API do Portal Científico está funcionando!"}
 
 @app.get("/me", response_model=UserResponse)
-def get_current_user_info(user: User = Depends(get_current_user)):
+def get_current_user_info(user: CurrentUser = Depends(get_current_user)):
     return user
 
 @app.get("/event", response_model=list[EventResponse])
-def get_all_events_route(db: Session = Depends(get_db)):
-    events = get_all_events(db)
-    return events
+async def get_all_events_route(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await catalog_response(request, "event", lambda: get_all_events(db), EventResponse)
+
+
+@app.get("/keywords", response_model=list[KeywordSummaryResponse])
+async def get_all_keywords(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Retorna todas as palavras-chave únicas cadastradas, com a quantidade de documentos"""
+    async def load_keywords():
+        result = await db.execute(
+            select(Keyword).where(Keyword.document_count > 0).order_by(Keyword.normalized)
+        )
+        return result.scalars().all()
 
+    return await catalog_response(request, "keywords", load_keywords, KeywordSummaryResponse)
 
-@app.get("/keywords", response_model=list[KeywordResponse])
-def get_all_keywords(db: Session = Depends(get_db)):
-    """Retorna todas as palavras-chave únicas cadastradas"""
-    keywords = db.query(DocumentKeyword).distinct(DocumentKeyword.keyword).all()
-    return keywords
+
+@app.get("/keywords/suggest", response_model=list[KeywordSummaryResponse])
+async def suggest_keywords(prefix: str, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    """Autocomplete de palavras-chave por prefixo (ignora acentos e maiúsculas)"""
+    if not keyword_index.loaded:
+        token = keyword_index.begin_load()
+        try:
+            result = await db.execute(select(Keyword))
+            keyword_index.load(result.scalars().all(), token)
+        finally:
+            keyword_index.end_load(token)
+    return keyword_index.suggest(prefix, min(limit, 50))
 
 
 @app.post("/event", response_model=EventResponse)
@@ -81,19 +146,24 @@ def create_course_route(data: CourseCreate, db: Session = Depends(get_db)):
     return course
 
 @app.get("/course", response_model=list[CourseResponse])
-def get_all_courses_route(db: Session = Depends(get_db)):
-    courses = get_all_courses(db)
-    return courses
+async def get_all_courses_route(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await catalog_response(request, "course", lambda: get_all_courses(db), CourseResponse)
 
 @app.post("/user", response_model=UserResponse)
-def create_user_route(data: UserCreate, db: Session = Depends(get_db)):
-    user = create_user(db, data)
+async def create_user_route(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        user = await create_user(db, data)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente", headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(status_code=400, detail="user already exists")
     return user
 
 @app.post("/upload")
-async def upload(file: UploadFile = File(...), user: User = Depends(get_current_user)):
+async def upload(file: UploadFile = File(...), user: CurrentUser = Depends(get_current_user)):
+    if file.size is not None and file.size > UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Arquivo excede o limite de {UPLOAD_MAX_SIZE} bytes")
+
     file_id = f"{uuid.uuid4()}-{slugify_filename(file.filename)}"
 
     # Determinar o content_type correto
@@ -107,8 +177,7 @@ async def upload(file: UploadFile = File(...), user: User = Depends(get_current_
         part_size=10 * 1024 * 1024,
         content_type=content_type,
     )
-
-    #internal_url = client.presigned_get_object(BUCKET, file_id)
+    schedule_thumbnail(file_id, content_type)
 
     # host interno que o MinIO usa no Docker
     return {
@@ -119,31 +188,52 @@ async def upload(file: UploadFile = File(...), user: User = Depends(get_current_
 
 
 @app.get("/files/{file_id:path}")
-async def serve_file(file_id: str):
-    """Serve arquivos do MinIO com headers corretos para visualização no navegador"""
-    try:
-        response = client.get_object(BUCKET, file_id)
-        data = response.read()
-        response.close()
-        response.release_conn()
-        
-        # Determinar content-type baseado na extensão
-        content_type = "application/octet-stream"
-        if file_id.lower().endswith(".pdf"):
-            content_type = "application/pdf"
-        elif file_id.lower().endswith((".jpg", ".jpeg")):
-            content_type = "image/jpeg"
-        elif file_id.lower().endswith(".png"):
-            content_type = "image/png"
-        
-        return StreamingResponse(
-            io.BytesIO(data),
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f"inline; filename={file_id.split('/')[-1]}",
-                "Cache-Control": "public, max-age=3600"
-            }
+def serve_file(file_id: str, request: Request):
+    """Serve arquivos do MinIO em streaming, com suporte a Range e GET condicional"""
+    if STORAGE_DIRECT_MODE:
+        # o cliente baixa direto do MinIO (Range e cache condicional ficam a cargo dele)
+        return RedirectResponse(
+            presigned_get_url(file_id),
+            status_code=302,
+            headers={"Cache-Control": f"private, max-age={PRESIGNED_URL_EXPIRES // 2}"},
         )
+
+    try:
+        stat = stat_object(file_id)
     except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Arquivo não encontrado: {str(e)}")
+        if is_missing_object(e):
+            raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+        raise HTTPException(status_code=502, detail=f"Erro ao acessar o armazenamento: {str(e)}")
+
+    headers = object_headers(stat, file_id)
 
+    if is_not_modified(request.headers, headers["ETag"], stat.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), stat.size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{stat.size}"})
+
+    # If-Range: só responde parcial se o arquivo não mudou desde a primeira leitura
+    if_range = request.headers.get("if-range")
+    if byte_range and if_range and if_range != headers["ETag"]:
+        byte_range = None
+
+    media_type = content_type_for(stat, file_id)
+
+    if byte_range:
+        start, length = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{start + length - 1}/{stat.size}"
+    else:
+        start, length, status_code = 0, stat.size, 200
+    headers["Content-Length"] = str(length)
+
+    # arquivos populares saem do cache em disco; os demais vêm de um único download do MinIO
+    # por arquivo, compartilhado pelas requisições simultâneas
+    cached = file_cache.open(file_id, stat.etag)
+    if cached:
+        return CachedFileResponse(cached, start, length, status_code=status_code, media_type=media_type, headers=headers)
+    body = file_cache.stream(file_id, stat.etag, stat.size, start, length)
+    return StreamingResponse(body, status_code=status_code, media_type=media_type, headers=headers)
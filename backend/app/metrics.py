@@ -0,0 +1,254 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Histograma cumulativo (no formato do Prometheus) com buckets fixos, em segundos."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+class PoolMetrics:
+    """Contadores do pool de conexões de uma engine."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.wait_seconds = Histogram()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.connects = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        return {
+            "pool_size": pool.size() if pool else None,
+            "checked_out": pool.checkedout() if pool else None,
+            "checked_in": pool.checkedin() if pool else None,
+            "overflow": max(pool.overflow(), 0) if pool else None,
+            "checkouts_total": self.checkouts,
+            "overflow_events_total": self.overflow_events,
+            "timeouts_total": self.timeouts,
+            "invalidations_total": self.invalidations,
+            "connects_total": self.connects,
+            "wait_seconds": self.wait_seconds.snapshot(),
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Mede o tempo de espera por conexão e os eventos de overflow/timeout do QueuePool."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        metrics = self.metrics
+        if metrics is None:
+            return super()._do_get()
+
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            metrics.wait_seconds.observe(time.perf_counter() - start)
+            metrics.increment("timeouts")
+            raise
+        metrics.wait_seconds.observe(time.perf_counter() - start)
+        if self.overflow() > max(overflow_before, 0):
+            metrics.increment("overflow_events")
+        return connection
+
+    def recreate(self):
+        # engine.dispose() recria o pool; mantém os mesmos contadores
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = new_pool
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(name: str, engine) -> PoolMetrics:
+    """Registra os contadores do pool da engine (para AsyncEngine, passar engine.sync_engine)."""
+    metrics = PoolMetrics(name)
+    metrics.pool = engine.pool
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    pool_metrics[name] = metrics
+    return metrics
+
+
+# ---------------------------------------------------------------------------
+# Latência por rota e exportação no formato texto do Prometheus
+# ---------------------------------------------------------------------------
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class LabeledHistograms:
+    """Um Histogram por combinação de labels (ex.: método, rota, status)."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._histograms: dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        histogram = self._histograms.get(label_values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(label_values, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def items(self):
+        with self._lock:
+            return list(self._histograms.items())
+
+
+request_duration = LabeledHistograms(
+    "http_request_duration_seconds", "Duração das requisições HTTP", ("method", "route", "status")
+)
+request_db_duration = LabeledHistograms(
+    "http_request_db_seconds", "Tempo gasto no banco por requisição", ("method", "route")
+)
+request_queries = LabeledHistograms(
+    "http_request_queries", "Statements SQL por requisição", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_serialize_duration = LabeledHistograms(
+    "http_request_serialize_seconds", "Tempo de serialização da resposta", ("method", "route")
+)
+request_storage_duration = LabeledHistograms(
+    "http_request_storage_seconds", "Tempo gasto no MinIO por requisição", ("method", "route")
+)
+
+ROUTE_HISTOGRAMS = (
+    request_duration, request_db_duration, request_queries, request_serialize_duration, request_storage_duration,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _render_histogram(lines: list, name: str, label_names, label_values, histogram: Histogram):
+    snapshot = histogram.snapshot()
+    for bound, count in snapshot["buckets"].items():
+        le = f'le="{bound}"'
+        lines.append(f"{name}_bucket{_labels(label_names, label_values, le)} {count}")
+    lines.append(f"{name}_sum{_labels(label_names, label_values)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(label_names, label_values)} {snapshot['count']}")
+
+
+# outros módulos registram funções que retornam linhas adicionais para /metrics
+_collectors: list = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+    return collector
+
+
+POOL_COUNTERS = ("checkouts", "overflow_events", "timeouts", "invalidations", "connects")
+
+
+def render_prometheus() -> str:
+    lines = []
+    for histograms in ROUTE_HISTOGRAMS:
+        lines.append(f"# HELP {histograms.name} {histograms.help}")
+        lines.append(f"# TYPE {histograms.name} histogram")
+        for label_values, histogram in histograms.items():
+            _render_histogram(lines, histograms.name, histograms.labels, label_values, histogram)
+
+    for counter in POOL_COUNTERS:
+        lines.append(f"# TYPE db_pool_{counter}_total counter")
+        for name, metrics in pool_metrics.items():
+            lines.append(f"db_pool_{counter}_total{_labels(('engine',), (name,))} {getattr(metrics, counter)}")
+
+    for gauge in ("checked_out", "checked_in", "overflow", "pool_size"):
+        lines.append(f"# TYPE db_pool_{gauge} gauge")
+        for name, metrics in pool_metrics.items():
+            value = metrics.snapshot()[gauge]
+            if value is not None:
+                lines.append(f"db_pool_{gauge}{_labels(('engine',), (name,))} {value}")
+
+    lines.append("# TYPE db_pool_wait_seconds histogram")
+    for name, metrics in pool_metrics.items():
+        _render_histogram(lines, "db_pool_wait_seconds", ("engine",), (name,), metrics.wait_seconds)
+
+    for collector in _collectors:
+        lines.extend(collector())
+
+    return "\n".join(lines) + "\n"
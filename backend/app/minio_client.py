@@ -2,6 +2,16 @@ from minio import Minio
 from dotenv import load_dotenv
 import os
 
+from app.profiling import storage_timer
+
+
+class ProfiledMinio(Minio):
+    """Soma o tempo de cada chamada HTTP ao MinIO no perfil da requisição atual"""
+
+    def _url_open(self, *args, **kwargs):
+        with storage_timer():
+            return super()._url_open(*args, **kwargs)
+
 
 # Obtém variáveis de ambiente
 endpoint = os.getenv("MINIO_ENDPOINT")
@@ -15,7 +25,7 @@ clean_endpoint = (
 )
 
 # Cria o cliente MinIO
-client = Minio(
+client = ProfiledMinio(
     clean_endpoint,
     access_key=access_key,
     secret_key=secret_key,
@@ -23,3 +33,17 @@ client = Minio(
 )
 
 BUCKET = bucket
+
+# Modo direto: o cliente envia/baixa os arquivos no MinIO com URLs pré-assinadas.
+# A assinatura inclui o host, então as URLs são geradas com o endereço público do MinIO;
+# a região fixa evita que o SDK consulte o servidor para descobri-la.
+STORAGE_DIRECT_MODE = os.getenv("STORAGE_DIRECT_MODE", "false").lower() in ("1", "true", "yes")
+public_endpoint = os.getenv("PUBLIC_MINIO_ENDPOINT", "http://localhost:9000")
+
+presign_client = Minio(
+    public_endpoint.replace("http://", "").replace("https://", ""),
+    access_key=access_key,
+    secret_key=secret_key,
+    secure=public_endpoint.startswith("https://"),
+    region=os.getenv("MINIO_REGION", "us-east-1"),
+)
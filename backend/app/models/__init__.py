@@ -5,4 +5,9 @@ from .event import Event
 from .document import Document
 from .document_author import DocumentAuthor
 from .document_keyword import DocumentKeyword
+from .keyword import Keyword
+from .upload_session import UploadSession
+from .storage_outbox import StorageOutbox
+from .document_similarity import DocumentSimilarity
+from .similarity_queue import SimilarityQueue
 # ... demais modelos
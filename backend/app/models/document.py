@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Text, Index, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
 class Document(Base):
@@ -30,6 +31,36 @@ class Document(Base):
     
     file_url = Column(String, nullable=False)
 
+    # Busca textual (título, resumo, área, autores e palavras-chave), ver app/search.py
+    search_vector = Column(TSVECTOR, nullable=True)
+
+    # Texto extraído do PDF em segundo plano (app/text_extraction.py); não é carregado nas listagens
+    full_text = deferred(Column(Text, nullable=True))
+    text_status = Column(String, nullable=False, server_default="pending")  # pending, processing, done, failed
+    text_attempts = Column(Integer, nullable=False, server_default="0")
+    text_error = Column(Text, nullable=True)
+    text_next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
     # relationships
     authors = relationship("DocumentAuthor", cascade="all, delete-orphan")
     keywords = relationship("DocumentKeyword", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+        # paginação por cursor: ORDER BY publish_year DESC, id DESC
+        Index("ix_documents_publish_year_id", "publish_year", "id"),
+        Index("ix_documents_advisor_id_publish_year_id", "advisor_id", "publish_year", "id"),
+        # filtros (ver DocumentFilters): igualdade na ordem da listagem, ILIKE por trigramas
+        Index("ix_documents_type_publish_year_id", "type", "publish_year", "id"),
+        Index("ix_documents_event_id_publish_year_id", "event_id", "publish_year", "id"),
+        Index("ix_documents_course_id", "course_id"),
+        Index("ix_documents_field_trgm", "field", postgresql_using="gin", postgresql_ops={"field": "gin_trgm_ops"}),
+        # coletor de objetos órfãos (app/storage_gc.py): último segmento da URL, que não
+        # depende do host nem de PUBLIC_URL
+        Index("ix_documents_file_url_basename", func.regexp_replace(file_url, "^.*/", "")),
+        # fila de extração de texto
+        Index(
+            "ix_documents_text_queue", "text_next_attempt_at",
+            postgresql_where=text("text_status IN ('pending', 'processing')"),
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from app.database import Base
 
 class DocumentAuthor(Base):
@@ -6,6 +6,11 @@ class DocumentAuthor(Base):
 
     id = Column(Integer, primary_key=True)
 
-    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"))
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), index=True)
     name = Column(String, nullable=False)
     email = Column(String, nullable=True)
+
+    __table_args__ = (
+        # ILIKE '%...%'
+        Index("ix_document_authors_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
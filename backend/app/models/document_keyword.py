@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from app.database import Base
 
 class DocumentKeyword(Base):
@@ -6,5 +6,11 @@ class DocumentKeyword(Base):
 
     id = Column(Integer, primary_key=True)
 
-    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"))
-    keyword = Column(String, nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), index=True)
+    keyword = Column(String, nullable=False)  # texto como informado no documento
+    keyword_id = Column(Integer, ForeignKey("keywords.id"), nullable=True, index=True)
+
+    __table_args__ = (
+        # ILIKE '%...%'
+        Index("ix_document_keywords_keyword_trgm", "keyword", postgresql_using="gin", postgresql_ops={"keyword": "gin_trgm_ops"}),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer
+from app.database import Base
+
+class DocumentSimilarity(Base):
+    """Vizinhos mais próximos de cada documento (TF-IDF, cosseno), ver app/similarity.py."""
+    __tablename__ = "document_similarities"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    similar_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # GET /documents/{id}/similar: WHERE document_id = ? ORDER BY score DESC LIMIT k
+        Index("ix_document_similarities_document_id_score", "document_id", "score"),
+        # ON DELETE CASCADE de similar_id
+        Index("ix_document_similarities_similar_id", "similar_id"),
+    )
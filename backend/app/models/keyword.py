@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import synonym
+from app.database import Base
+
+class Keyword(Base):
+    __tablename__ = "keywords"
+
+    id = Column(Integer, primary_key=True)
+
+    name = Column(String, nullable=False)                     # grafia exibida ("Machine Learning")
+    normalized = Column(String, unique=True, nullable=False)  # sem acento e minúsculo ("machine learning")
+    document_count = Column(Integer, nullable=False, default=0)
+
+    keyword = synonym("name")
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, func
+from app.database import Base
+
+class SimilarityQueue(Base):
+    """Documentos cujos vizinhos precisam ser recalculados; gravados na mesma transação da alteração."""
+    __tablename__ = "similarity_queue"
+
+    id = Column(BigInteger, primary_key=True)
+    # sem chave estrangeira: exclusões também entram na fila. NULL = recalcular tudo
+    document_id = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text, func
+from app.database import Base
+
+class StorageOutbox(Base):
+    """Objetos do bucket a remover; gravados na mesma transação que deixa de referenciá-los."""
+    __tablename__ = "storage_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    object_name = Column(String, nullable=False)
+
+    attempts = Column(Integer, nullable=False, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
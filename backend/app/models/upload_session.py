@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, BigInteger, Boolean, DateTime, false, func
+from app.database import Base
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True)  # token opaco entregue ao cliente
+
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    object_name = Column(String, nullable=False, index=True)
+    upload_id = Column(String, nullable=True)  # id do multipart upload no MinIO; None no envio pré-assinado
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(BigInteger, nullable=False)  # = size no envio pré-assinado
+
+    completed = Column(Boolean, nullable=False, default=False)
+    # descartada (ex.: tamanho divergente): a linha fica para que nenhum documento use o object_name
+    aborted = Column(Boolean, nullable=False, default=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
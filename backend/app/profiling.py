@@ -0,0 +1,288 @@
+"""
+Perfil por requisição: quantidade de queries e tempo gasto no banco, na serialização da
+resposta e no MinIO.
+
+Os números de cada requisição vão para o header Server-Timing, para um log estruturado
+(logger "app.requests", uma linha JSON por requisição) e para os histogramas por rota
+expostos em /metrics.
+
+Com PROFILE_SAMPLE_RATE > 0, essa fração das requisições é amostrada por um profiler de
+pilha; se a requisição passar de PROFILE_SLOW_MS, as pilhas são gravadas em PROFILE_DIR no
+formato "folded" (uma pilha por linha, compatível com flamegraph.pl/speedscope). O
+amostrador enxerga todas as threads do processo, então sob concorrência as pilhas de
+outras requisições também aparecem.
+"""
+import functools
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.metrics import (
+    request_db_duration,
+    request_duration,
+    request_queries,
+    request_serialize_duration,
+    request_storage_duration,
+)
+
+PROFILE_SERVER_TIMING = os.getenv("PROFILE_SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+PROFILE_LOG_REQUESTS = os.getenv("PROFILE_LOG_REQUESTS", "true").lower() in ("1", "true", "yes")
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+
+logger = logging.getLogger("app.requests")
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    storage_calls: int = 0
+    storage_seconds: float = 0.0
+    storage_bytes: int = 0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return ", ".join((
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"',
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}",
+            f'storage;dur={self.storage_seconds * 1000:.2f};desc="{self.storage_calls} calls, {self.storage_bytes} bytes"',
+            f"total;dur={total_seconds * 1000:.2f}",
+        ))
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> RequestProfile | None:
+    return _current.get()
+
+
+@contextmanager
+def storage_timer(calls: int = 1):
+    """
+    Soma a duração do bloco ao tempo de armazenamento da requisição atual. Leituras do corpo
+    de uma chamada já contada (calls=0) entram só no tempo.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.storage_calls += calls
+        profile.storage_seconds += time.perf_counter() - start
+
+
+def count_storage_bytes(size: int):
+    profile = _current.get()
+    if profile is not None:
+        profile.storage_bytes += size
+
+
+def instrument_queries(engine):
+    """Conta os statements e o tempo de banco (para AsyncEngine, passar engine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is None or start is None:
+            return
+        profile.queries += 1
+        profile.db_seconds += time.perf_counter() - start
+
+
+def instrument_serialization():
+    """
+    Mede a validação/serialização do response_model. O FastAPI chama serialize_response
+    pelo nome global do módulo fastapi.routing, então basta substituí-lo.
+    """
+    import fastapi.routing
+
+    original = fastapi.routing.serialize_response
+    if getattr(original, "_profiled", False):
+        return
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        profile = _current.get()
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.serialize_seconds += time.perf_counter() - start
+
+    serialize_response._profiled = True
+    fastapi.routing.serialize_response = serialize_response
+
+
+# ---------------------------------------------------------------------------
+# Amostragem de pilhas das requisições lentas
+# ---------------------------------------------------------------------------
+
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+class StackSampler:
+    """Amostra as pilhas de todas as threads a cada `interval` segundos, em uma thread própria."""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue  # ignora threads ociosas (pool esperando trabalho, loop em select)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# um amostrador por vez: as amostras já cobrem o processo inteiro
+_sampler_lock = threading.Lock()
+
+
+def _start_sampler() -> StackSampler | None:
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        return None
+    if not _sampler_lock.acquire(blocking=False):
+        return None
+    sampler = StackSampler()
+    sampler.start()
+    return sampler
+
+
+def _finish_sampler(sampler: StackSampler, method: str, route: str, elapsed: float) -> str | None:
+    try:
+        sampler.stop()
+    finally:
+        _sampler_lock.release()
+
+    if elapsed * 1000 < PROFILE_SLOW_MS or not sampler.stacks:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^\w]+", "_", f"{method}{route}").strip("_")
+    path = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}.folded")
+    sampler.write(path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _route_template(scope) -> str:
+    # o FastAPI grava a rota encontrada no scope; usar o template evita um label por id
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI puro (o BaseHTTPMiddleware não propaga o ContextVar para a rota)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        sampler = _start_sampler()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if PROFILE_SERVER_TIMING:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", profile.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # inclui o corpo: em respostas em streaming é onde o MinIO é lido
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            self._record(scope, profile, status_code, elapsed, sampler)
+
+    def _record(self, scope, profile: RequestProfile, status_code: int, elapsed: float, sampler):
+        method = scope["method"]
+        route = _route_template(scope)
+
+        request_duration.observe((method, route, str(status_code)), elapsed)
+        request_db_duration.observe((method, route), profile.db_seconds)
+        request_queries.observe((method, route), profile.queries)
+        request_serialize_duration.observe((method, route), profile.serialize_seconds)
+        request_storage_duration.observe((method, route), profile.storage_seconds)
+
+        profile_path = _finish_sampler(sampler, method, route, elapsed) if sampler else None
+
+        slow = elapsed * 1000 >= PROFILE_SLOW_MS
+        if not PROFILE_LOG_REQUESTS and not slow:
+            return
+        record = {
+            "method": method,
+            "route": route,
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": profile.queries,
+            "db_ms": round(profile.db_seconds * 1000, 2),
+            "serialize_ms": round(profile.serialize_seconds * 1000, 2),
+            "storage_calls": profile.storage_calls,
+            "storage_ms": round(profile.storage_seconds * 1000, 2),
+            "storage_bytes": profile.storage_bytes,
+        }
+        if profile_path:
+            record["profile"] = profile_path
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import CurrentUser, get_current_user
+from app.file_cache import file_cache
+from app.metrics import pool_metrics, render_prometheus
+
+router = APIRouter()
+
+@router.get("/admin/metrics/db")
+def get_db_pool_metrics(user: CurrentUser = Depends(get_current_user)):
+    """Estado dos pools de conexão: conexões em uso, overflow, timeouts, invalidações e tempo de espera"""
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+
+@router.get("/admin/metrics/files")
+def get_file_cache_metrics(user: CurrentUser = Depends(get_current_user)):
+    """Cache de arquivos em disco: acertos, faltas, downloads, remoções por LRU e ocupação"""
+    return file_cache.snapshot()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_prometheus_metrics():
+    """Latência por rota (total, banco, serialização, MinIO) e pools de conexão no formato do Prometheus"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
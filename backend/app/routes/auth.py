@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.auth import LoginData, Token
-from app.database import get_db
+from app.database import get_async_db
 from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.crud.user import authenticate_user
+from app.core.hashing import HashingOverloaded
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(data: LoginData, db: Session = Depends(get_db)):
-    user = authenticate_user(db, data.email, data.password)
+async def login(data: LoginData, db: AsyncSession = Depends(get_async_db)):
+    try:
+        user = await authenticate_user(db, data.email, data.password)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente", headers={"Retry-After": "1"})
 
     if not user:
         raise HTTPException(status_code=401, detail="Email ou senha inválidos")
@@ -1,114 +1,222 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import exc, or_
-from typing import List
+from sqlalchemy import exc, or_, select
+from typing import List, Literal
 
 from app.schemas.auth import LoginData, Token
-from app.database import get_db
-from app.core.auth import get_current_user
+from app.database import get_db, get_async_db
+from app.core.auth import CurrentUser, get_current_user
 from app.crud.user import authenticate_user
 from app.schemas.document import DocumentCreate, DocumentUpdate
-from app.models.user import User
 from app.models.document import Document
 from app.models.document_author import DocumentAuthor
 from app.models.document_keyword import DocumentKeyword
-from app.schemas.document import DocumentResponse
+from app.models.upload_session import UploadSession
+from app.schemas.document import (
+    DocumentBatchRequest,
+    DocumentBatchResponse,
+    DocumentFacetsResponse,
+    DocumentResponse,
+)
+from app.search import refresh_search_vectors
+from app.crud.keyword import build_document_keywords, refresh_keyword_counts
+from app.keyword_index import keyword_index
+from app.bulk_import import guess_format, import_documents, open_text
+from app.export import export_csv, export_ndjson
+from app.text_extraction import reset_text_extraction, text_extraction_pool
+from app.utils import object_name_from_url, thumbnail_version
+from app.storage import is_not_modified
+from app.thumbnails import ThumbnailUnavailable, get_thumbnail, thumbnail_name
+from app.file_cache import file_cache
+from app.storage_outbox import enqueue_removal, outbox_drainer
+from app.similarity import SIMILARITY_FIELDS, SIMILARITY_TOP_K, enqueue_similarity_update, similarity_updater
+from app.crud.document import (
+    DOCUMENT_LOAD_OPTIONS,
+    DocumentFilters,
+    count_documents,
+    get_document_facets,
+    get_documents_by_ids,
+    get_similar_documents,
+    invalidate_document_caches,
+    paginate_documents,
+)
 
-from app.minio_client import client, BUCKET
 from uuid import uuid4
 
 router = APIRouter()
 
+MAX_BATCH_IDS = 500
+
+THUMBNAIL_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+THUMBNAIL_DEFAULT_CACHE = "public, max-age=3600"
+
 @router.get("/documents/my-publications", response_model=list[DocumentResponse])
-def get_user_documents(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def get_user_documents(
+    response: Response,
+    limit: int | None = None,
+    after: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
+):
     """Retorna apenas os documentos onde o usuário é o advisor"""
-    return db.query(Document).options(
-        joinedload(Document.authors),
-        joinedload(Document.keywords),
-        joinedload(Document.advisor),
-        joinedload(Document.course),
-        joinedload(Document.event)
-    ).filter(Document.advisor_id == user.id).all()
-
-
-def get_all_documents(db: Session = Depends(get_db)):
-    return db.query(Document).options(
-        joinedload(Document.authors),
-        joinedload(Document.keywords),
-        joinedload(Document.advisor),
-        joinedload(Document.course),
-        joinedload(Document.event)
-    ).all()
+    statement = select(Document).options(*DOCUMENT_LOAD_OPTIONS).where(Document.advisor_id == user.id)
+
+    try:
+        documents, next_cursor = await paginate_documents(db, statement, Document.publish_year, limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return documents
+
 
 @router.get("/documents", response_model=list[DocumentResponse])
-def get_all_documents_filtered(
-    q: str | None = None,
-    type: List[str] = Query(default=[]),
-    publish_year: List[int] = Query(default=[]),
-    field: List[str] = Query(default=[]),
-    keyword: List[str] = Query(default=[]),
-    event_id: List[int] = Query(default=[]),
+async def get_all_documents_filtered(
+    response: Response,
+    filters: DocumentFilters = Depends(),
     limit: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    after: str | None = None,
+    total: Literal["exact", "estimate"] | None = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Retorna documentos aplicando filtros opcionais via query params (suporta múltiplos valores)"""
-
-    query = db.query(Document).options(
-        joinedload(Document.authors),
-        joinedload(Document.keywords),
-        joinedload(Document.advisor),
-        joinedload(Document.course),
-        joinedload(Document.event)
-    )
+    """
+    Retorna documentos aplicando filtros opcionais via query params (suporta múltiplos valores).
 
-    if q:
-        # procura por título ou nome de autor
-        query = query.join(Document.authors, isouter=True).filter(
-            or_(Document.title.ilike(f"%{q}%"), DocumentAuthor.name.ilike(f"%{q}%"))
-        )
+    Paginação: `offset`/`limit` ou, para rolagem infinita, `after` com o valor do header
+    `X-Next-Cursor` da página anterior (busca por índice, custo constante em qualquer página).
+    Com `total=exact|estimate` o total vem no header `X-Total-Count`.
+    """
+
+    statement = select(Document).options(*DOCUMENT_LOAD_OPTIONS)
+    statement = filters.apply(statement)
+
+    try:
+        results, next_cursor = await paginate_documents(db, statement, filters.sort_key(), limit, offset, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total:
+        response.headers["X-Total-Count"] = str(await count_documents(db, filters, total))
+        response.headers["X-Total-Count-Type"] = total
+    return results
 
-    if type:
-        query = query.filter(Document.type.in_(type))
 
-    if publish_year:
-        query = query.filter(Document.publish_year.in_(publish_year))
+@router.get("/documents/facets", response_model=DocumentFacetsResponse)
+async def get_documents_facets(filters: DocumentFilters = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Contagens por type, publish_year, field, event_id e keyword para os mesmos filtros de /documents"""
+    return await get_document_facets(db, filters)
 
-    if field:
-        # Para múltiplos campos, usa OR entre eles
-        field_filters = [Document.field.ilike(f"%{f}%") for f in field]
-        query = query.filter(or_(*field_filters))
 
-    if keyword:
-        # Para múltiplas keywords, usa OR entre elas
-        keyword_filters = [DocumentKeyword.keyword.ilike(f"%{k}%") for k in keyword]
-        query = query.join(Document.keywords, isouter=True).filter(or_(*keyword_filters))
+@router.get("/documents/batch", response_model=DocumentBatchResponse)
+async def get_documents_batch(ids: List[int] = Query(default=[]), db: AsyncSession = Depends(get_async_db)):
+    """Retorna vários documentos de uma vez (?ids=1&ids=2...), na ordem pedida"""
+    return await _documents_batch(db, ids)
 
-    if event_id:
-        query = query.filter(Document.event_id.in_(event_id))
 
-    # Remove duplicatas e aplica limite e offset
-    results = query.distinct().offset(offset).limit(limit).all()
-    return results
+@router.post("/documents/batch", response_model=DocumentBatchResponse)
+async def post_documents_batch(data: DocumentBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Mesmo que GET /documents/batch, com os ids no corpo (listas longas)"""
+    return await _documents_batch(db, data.ids)
+
+
+async def _documents_batch(db: AsyncSession, ids: list[int]):
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_BATCH_IDS} ids por requisição")
+    documents, missing = await get_documents_by_ids(db, ids)
+    return {"documents": documents, "missing": missing}
+
+
+@router.get("/documents/export")
+async def export_documents(format: Literal["ndjson", "csv"] = "ndjson", filters: DocumentFilters = Depends()):
+    """Exporta todo o acervo (ou o resultado dos filtros de /documents) em NDJSON ou CSV, em streaming"""
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(filters),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": "attachment; filename=documents.csv"},
+        )
+    return StreamingResponse(
+        export_ndjson(filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=documents.ndjson"},
+    )
 
 
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
-def get_document_by_id(document_id: int, db: Session = Depends(get_db)):
+async def get_document_by_id(document_id: int, db: AsyncSession = Depends(get_async_db)):
     """Retorna os detalhes de um documento específico"""
-    document = db.query(Document).options(
-        joinedload(Document.authors),
-        joinedload(Document.keywords),
-        joinedload(Document.advisor),
-        joinedload(Document.course),
-        joinedload(Document.event)
-    ).filter(Document.id == document_id).first()
+    result = await db.execute(
+        select(Document).options(*DOCUMENT_LOAD_OPTIONS).where(Document.id == document_id)
+    )
+    document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=404, detail="Documento não encontrado")
     return document
 
 
+@router.get("/documents/{document_id}/similar", response_model=list[DocumentResponse])
+async def get_similar_documents_route(document_id: int, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    """
+    Documentos mais parecidos (título, resumo, keywords e área), do mais ao menos parecido.
+    Os vizinhos são calculados em segundo plano: um documento recém-criado pode vir sem eles.
+    """
+    documents = await get_similar_documents(db, document_id, max(1, min(limit, SIMILARITY_TOP_K)))
+    if documents is None:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+    return documents
+
+
+@router.get("/documents/{document_id}/thumbnail")
+def get_document_thumbnail(document_id: int, request: Request, v: str | None = None, db: Session = Depends(get_db)):
+    """
+    Miniatura (JPEG) da primeira página do PDF, gerada na primeira vez se ainda não existir.
+    Com `v` igual ao de `thumbnail_url`, a resposta pode ficar em cache indefinidamente.
+    """
+    file_url = db.query(Document.file_url).filter(Document.id == document_id).scalar()
+    if file_url is None:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+
+    try:
+        data, etag = get_thumbnail(object_name_from_url(file_url))
+    except ThumbnailUnavailable:
+        raise HTTPException(status_code=404, detail="Miniatura indisponível para este documento")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao acessar o armazenamento: {str(e)}")
+
+    headers = {
+        "ETag": f'"{etag}"',
+        # `v` antigo ou ausente: o arquivo do documento pode mudar, então o cache é limitado
+        "Cache-Control": THUMBNAIL_IMMUTABLE_CACHE if v == thumbnail_version(file_url) else THUMBNAIL_DEFAULT_CACHE,
+    }
+    if is_not_modified(request.headers, headers["ETag"], None):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type="image/jpeg", headers=headers)
+
+
+def _ensure_upload_completed(db: Session, file_url: str):
+    """
+    Recusa arquivos de sessões de upload (multipart ou pré-assinadas) ainda não concluídas
+    ou descartadas (canceladas, vencidas ou com tamanho divergente).
+    """
+    pending = db.query(UploadSession.aborted).filter(
+        UploadSession.object_name == object_name_from_url(file_url),
+        UploadSession.completed.is_(False),
+    ).first()
+    if pending and pending.aborted:
+        raise HTTPException(status_code=409, detail="O upload do arquivo foi descartado; envie o arquivo novamente")
+    if pending:
+        raise HTTPException(status_code=409, detail="O upload do arquivo ainda não foi concluído")
+
+
 @router.post("/documents")
-def create_document(data: DocumentCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create_document(data: DocumentCreate, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    _ensure_upload_completed(db, data.file_url)
 
     document = Document(
         title=data.title,
@@ -133,24 +241,51 @@ def create_document(data: DocumentCreate, db: Session = Depends(get_db), user: U
             )
         )
 
-    # Criar DocumentKeyword
-    for kw in data.keywords:
-        document.keywords.append(
-            DocumentKeyword(keyword=kw)
-        )
+    # Criar DocumentKeyword (vinculadas ao vocabulário normalizado)
+    document.keywords.extend(build_document_keywords(db, data.keywords))
 
     db.add(document)
+    db.flush()
+    refresh_search_vectors(db, [document.id])
+    updated_keywords = refresh_keyword_counts(db, [k.keyword_id for k in document.keywords])
+    enqueue_similarity_update(db, [document.id])
     db.commit()
+    invalidate_document_caches()
+    keyword_index.upsert(updated_keywords)
+    text_extraction_pool.wake()
+    similarity_updater.wake()
     db.refresh(document)
 
     return document
 
+@router.post("/documents/import")
+def import_documents_route(
+    file: UploadFile = File(...),
+    format: Literal["jsonl", "csv", "bibtex"] | None = None,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Importa documentos em lote a partir de um arquivo JSONL, CSV ou BibTeX.
+    Retorna quantos foram inseridos e o relatório de erros por linha.
+    """
+    format = format or guess_format(file.filename)
+    if not format:
+        raise HTTPException(status_code=400, detail="Formato não reconhecido; informe ?format=jsonl|csv|bibtex")
+
+    # o UploadFile já está em arquivo temporário; a leitura é feita linha a linha
+    report = import_documents(db, open_text(file.file), format)
+    text_extraction_pool.wake()
+    similarity_updater.wake()
+    return report
+
+
 @router.put("/documents/{document_id}", response_model=DocumentResponse)
 def update_document(
     document_id: int,
     data: DocumentUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     document = db.query(Document).filter(Document.id == document_id).first()
 
@@ -161,15 +296,13 @@ def update_document(
     if document.advisor_id != user.id:
         raise HTTPException(status_code=403, detail="Sem permissão para editar este documento")
     
-    if(data.file_url != document.file_url):
-        try:
-            object_name = document.file_url.split("/", 4)[-1]
-
-            client.remove_object(BUCKET, object_name)
-
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Erro ao deletar arquivo no MinIO: {str(e)}")
-                
+    # file_url ausente no corpo mantém o arquivo atual
+    file_changed = data.file_url is not None and data.file_url != document.file_url
+    if file_changed:
+        _ensure_upload_completed(db, data.file_url)
+        # o arquivo antigo só é apagado se esta transação fizer commit
+        old_object_name = object_name_from_url(document.file_url)
+        enqueue_removal(db, [old_object_name, thumbnail_name(old_object_name)])
 
     # Atualizar campos simples
     for field, value in data.dict(exclude_unset=True, exclude={"authors", "keywords"}).items():
@@ -184,12 +317,33 @@ def update_document(
             )
 
     # Atualizar keywords (se enviado)
+    keyword_ids = []
     if data.keywords is not None:
+        keyword_ids = [k.keyword_id for k in document.keywords]
         document.keywords.clear()
-        for kw in data.keywords:
-            document.keywords.append(DocumentKeyword(keyword=kw))
+        document.keywords.extend(build_document_keywords(db, data.keywords))
+        keyword_ids += [k.keyword_id for k in document.keywords]
+
+    # o texto do PDF antigo sai da busca; o novo é extraído em segundo plano
+    if file_changed:
+        reset_text_extraction(document)
 
+    similarity_changed = bool(SIMILARITY_FIELDS & data.dict(exclude_unset=True).keys())
+    if similarity_changed:
+        enqueue_similarity_update(db, [document.id])
+
+    db.flush()
+    refresh_search_vectors(db, [document.id])
+    updated_keywords = refresh_keyword_counts(db, keyword_ids)
     db.commit()
+    invalidate_document_caches()
+    keyword_index.upsert(updated_keywords)
+    if similarity_changed:
+        similarity_updater.wake()
+    if file_changed:
+        file_cache.invalidate(old_object_name)
+        outbox_drainer.wake()
+        text_extraction_pool.wake()
     db.refresh(document)
 
     return document
@@ -199,7 +353,7 @@ def update_document(
 def delete_document(
     document_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     document = db.query(Document).filter(Document.id == document_id).first()
 
@@ -210,17 +364,23 @@ def delete_document(
     if document.advisor_id != user.id:
         raise HTTPException(status_code=403, detail="Sem permissão para excluir este documento")
 
-    try:
-        object_name = document.file_url.split("/", 4)[-1]
-
-        client.remove_object(BUCKET, object_name)
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao deletar arquivo no MinIO: {str(e)}")
+    # o arquivo é apagado em segundo plano, depois do commit
+    object_name = object_name_from_url(document.file_url)
+    enqueue_removal(db, [object_name, thumbnail_name(object_name)])
 
+    keyword_ids = [k.keyword_id for k in document.keywords]
 
     db.delete(document)
+    db.flush()
+    updated_keywords = refresh_keyword_counts(db, keyword_ids)
+    # as listas de vizinhos que o incluíam são recalculadas
+    enqueue_similarity_update(db, [document_id])
     db.commit()
+    invalidate_document_caches()
+    keyword_index.upsert(updated_keywords)
+    file_cache.invalidate(object_name)
+    outbox_drainer.wake()
+    similarity_updater.wake()
 
     return {"message": "Documento excluído com sucesso"}
 
@@ -0,0 +1,280 @@
+import math
+from uuid import uuid4
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.auth import CurrentUser, get_current_user
+from app.database import get_db
+from app.minio_client import client, BUCKET, STORAGE_DIRECT_MODE
+from app.models.upload_session import UploadSession
+from app.schemas.upload import (
+    PresignedUploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    UploadResponse,
+)
+from app.storage import (
+    MAX_MULTIPART_PARTS,
+    PRESIGNED_URL_EXPIRES,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_MAX_SIZE,
+    abort_multipart_upload,
+    complete_multipart_upload,
+    create_multipart_upload,
+    is_missing_object,
+    list_parts,
+    presigned_put_url,
+    upload_part,
+)
+from app.storage_outbox import enqueue_removal, outbox_drainer
+from app.thumbnails import schedule_thumbnail
+from app.utils import get_public_url, slugify_filename
+
+router = APIRouter()
+
+
+def _total_parts(session: UploadSession) -> int:
+    return max(1, math.ceil(session.size / session.chunk_size))
+
+
+def _expected_part_size(session: UploadSession, part_number: int) -> int:
+    if part_number < _total_parts(session):
+        return session.chunk_size
+    return session.size - session.chunk_size * (_total_parts(session) - 1)
+
+
+def _get_session(db: Session, upload_id: str, user: CurrentUser) -> UploadSession:
+    session = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Sessão de upload não encontrada")
+    if session.aborted:
+        raise HTTPException(status_code=410, detail="Sessão de upload descartada; inicie um novo envio")
+    return session
+
+
+def _session_response(session: UploadSession, parts: list) -> UploadSessionResponse:
+    received = sorted(part.part_number for part in parts)
+
+    # offset = bytes contíguos já recebidos (retomar a partir daqui)
+    contiguous = 0
+    for number in received:
+        if number != contiguous + 1:
+            break
+        contiguous = number
+
+    return UploadSessionResponse(
+        id=session.id,
+        filename=session.filename,
+        size=session.size,
+        chunk_size=session.chunk_size,
+        total_parts=_total_parts(session),
+        received_parts=received,
+        offset=min(contiguous * session.chunk_size, session.size),
+        completed=session.completed,
+    )
+
+
+def _check_size(size: int):
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="Tamanho do arquivo inválido")
+    if size > UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Arquivo excede o limite de {UPLOAD_MAX_SIZE} bytes")
+
+
+@router.post("/uploads", response_model=UploadSessionResponse)
+def create_upload_session(
+    data: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """Inicia um upload retomável: o arquivo é enviado em partes numeradas via PUT"""
+    _check_size(data.size)
+
+    # garante que o arquivo caiba no limite de partes do multipart
+    chunk_size = max(UPLOAD_CHUNK_SIZE, math.ceil(data.size / MAX_MULTIPART_PARTS))
+    content_type = data.content_type or "application/octet-stream"
+    object_name = f"{uuid4()}-{slugify_filename(data.filename)}"
+
+    try:
+        multipart_id = create_multipart_upload(object_name, content_type)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao iniciar upload no MinIO: {str(e)}")
+
+    session = UploadSession(
+        id=uuid4().hex,
+        user_id=user.id,
+        object_name=object_name,
+        upload_id=multipart_id,
+        filename=data.filename,
+        content_type=content_type,
+        size=data.size,
+        chunk_size=chunk_size,
+        completed=False,
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+
+    return _session_response(session, [])
+
+
+@router.post("/uploads/presigned", response_model=PresignedUploadResponse)
+def create_presigned_upload(
+    data: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Modo direto: retorna uma URL pré-assinada para o cliente enviar o arquivo com PUT
+    diretamente ao MinIO. Depois do envio, POST /uploads/{id}/complete confere o objeto;
+    só então o arquivo pode ser usado em um documento.
+    """
+    if not STORAGE_DIRECT_MODE:
+        raise HTTPException(status_code=400, detail="Envio direto ao armazenamento está desabilitado")
+    _check_size(data.size)
+
+    content_type = data.content_type or "application/octet-stream"
+    object_name = f"{uuid4()}-{slugify_filename(data.filename)}"
+
+    session = UploadSession(
+        id=uuid4().hex,
+        user_id=user.id,
+        object_name=object_name,
+        upload_id=None,
+        filename=data.filename,
+        content_type=content_type,
+        size=data.size,
+        chunk_size=data.size,
+        completed=False,
+    )
+    db.add(session)
+    db.commit()
+
+    return PresignedUploadResponse(
+        id=session.id,
+        object_name=object_name,
+        upload_url=presigned_put_url(object_name),
+        headers={"Content-Type": content_type},
+        expires_in=PRESIGNED_URL_EXPIRES,
+    )
+
+
+def _verify_presigned_upload(db: Session, session: UploadSession):
+    """Confere se o PUT direto chegou ao MinIO com o tamanho declarado."""
+    try:
+        stat = client.stat_object(BUCKET, session.object_name)
+    except Exception as e:
+        if is_missing_object(e):
+            raise HTTPException(status_code=409, detail="O arquivo ainda não foi enviado ao armazenamento")
+        raise HTTPException(status_code=502, detail=f"Erro ao acessar o armazenamento: {str(e)}")
+
+    if stat.size != session.size:
+        # a sessão é encerrada e o objeto removido em segundo plano: um reenvio para a mesma
+        # URL antes da remoção nunca chega a ser concluído nem usado por um documento
+        # (a linha da sessão continua lá, não concluída)
+        session.aborted = True
+        enqueue_removal(db, [session.object_name])
+        db.commit()
+        outbox_drainer.wake()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tamanho do arquivo enviado ({stat.size} bytes) difere do informado ({session.size} bytes); "
+                   "inicie um novo envio",
+        )
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+def get_upload_session(upload_id: str, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    """Retorna as partes já recebidas e o offset para retomar o envio"""
+    session = _get_session(db, upload_id, user)
+    parts = [] if session.completed or session.upload_id is None else list_parts(session.object_name, session.upload_id)
+    return _session_response(session, parts)
+
+
+@router.put("/uploads/{upload_id}/parts/{part_number}")
+def put_upload_part(
+    upload_id: str,
+    part_number: int,
+    chunk: bytes = Body(..., media_type="application/octet-stream"),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Envia a parte `part_number` (1..total_parts) com o corpo binário do bloco.
+    Partes podem ser enviadas em paralelo e reenviadas em caso de falha.
+    """
+    session = _get_session(db, upload_id, user)
+    if session.completed:
+        raise HTTPException(status_code=409, detail="Upload já concluído")
+    if session.upload_id is None:
+        raise HTTPException(status_code=400, detail="Sessão de envio direto não recebe partes")
+
+    if part_number < 1 or part_number > _total_parts(session):
+        raise HTTPException(status_code=400, detail="Número de parte inválido")
+
+    expected = _expected_part_size(session, part_number)
+    if len(chunk) != expected:
+        raise HTTPException(status_code=400, detail=f"A parte {part_number} deve ter {expected} bytes")
+
+    try:
+        etag = upload_part(session.object_name, session.upload_id, part_number, chunk)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao enviar parte para o MinIO: {str(e)}")
+
+    return {"part_number": part_number, "etag": etag, "size": len(chunk)}
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadResponse)
+def complete_upload_session(upload_id: str, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    """
+    Junta as partes no MinIO (ou, no envio pré-assinado, confere se o objeto existe e tem o
+    tamanho informado) e retorna o arquivo no mesmo formato de /upload
+    """
+    session = _get_session(db, upload_id, user)
+
+    if not session.completed:
+        if session.upload_id is None:
+            _verify_presigned_upload(db, session)
+        else:
+            parts = list_parts(session.object_name, session.upload_id)
+            missing = set(range(1, _total_parts(session) + 1)) - {part.part_number for part in parts}
+            if missing:
+                raise HTTPException(status_code=409, detail=f"Partes pendentes: {sorted(missing)}")
+
+            try:
+                complete_multipart_upload(session.object_name, session.upload_id, parts)
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f"Erro ao concluir upload no MinIO: {str(e)}")
+
+        session.completed = True
+        db.commit()
+        schedule_thumbnail(session.object_name, session.content_type)
+
+    return {
+        "filename": session.filename,
+        "id": session.object_name,
+        "url": get_public_url(session.object_name),
+    }
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload_session(upload_id: str, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    """Cancela o upload e descarta as partes já enviadas"""
+    session = _get_session(db, upload_id, user)
+    if session.completed:
+        raise HTTPException(status_code=409, detail="Upload já concluído")
+
+    try:
+        if session.upload_id is None:
+            client.remove_object(BUCKET, session.object_name)
+        else:
+            abort_multipart_upload(session.object_name, session.upload_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao cancelar upload no MinIO: {str(e)}")
+
+    # a linha fica como registro: nenhum documento pode usar o object_name
+    session.aborted = True
+    db.commit()
+
+    return {"message": "Upload cancelado"}
@@ -1,10 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import List, Optional
 from .event import EventResponse
 from .user import UserResponse
 from .course import CourseResponse
 from .author import AuthorResponse
 from .keyword import KeywordResponse
+from app.utils import thumbnail_version
 
 class AuthorCreate(BaseModel):
     name: str
@@ -68,9 +69,34 @@ class DocumentResponse(BaseModel):
     authors: List[AuthorResponse]
     keywords: List[KeywordResponse]
 
+    text_status: Optional[str] = None  # extração do texto do PDF: pending, processing, done, failed
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> str:
+        return f"/documents/{self.id}/thumbnail?v={thumbnail_version(self.file_url)}"
+
     class Config:
         orm_mode = True
 
+class DocumentBatchRequest(BaseModel):
+    ids: List[int]
+
+class DocumentBatchResponse(BaseModel):
+    documents: List[DocumentResponse]  # na mesma ordem dos ids pedidos
+    missing: List[int]
+
+class FacetCount(BaseModel):
+    value: str | int
+    count: int
+
+class DocumentFacetsResponse(BaseModel):
+    type: List[FacetCount]
+    publish_year: List[FacetCount]
+    field: List[FacetCount]
+    event_id: List[FacetCount]
+    keyword: List[FacetCount]
+
 class AuthorUpdate(BaseModel):
     name: str
     email: Optional[str] = None
@@ -12,3 +12,12 @@ class KeywordResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class KeywordSummaryResponse(BaseModel):
+    id: int
+    keyword: str
+    document_count: int
+
+    class Config:
+        orm_mode = True
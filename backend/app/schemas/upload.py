@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    filename: str
+    size: int
+    chunk_size: int
+    total_parts: int
+    received_parts: List[int]
+    offset: int  # bytes recebidos em sequência a partir do início
+    completed: bool
+
+class UploadResponse(BaseModel):
+    filename: str
+    id: str
+    url: str
+
+class PresignedUploadResponse(BaseModel):
+    id: str  # sessão: chamar POST /uploads/{id}/complete depois do PUT
+    object_name: str
+    upload_url: str  # PUT direto no MinIO
+    headers: Dict[str, str]  # headers que o PUT deve enviar
+    expires_in: int
@@ -0,0 +1,55 @@
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+
+# Configurações de busca textual criadas na migration (stemming + unaccent)
+SEARCH_CONFIGS = ("pt_unaccent", "en_unaccent")
+
+# Fontes de texto indexadas e seus pesos (A = mais relevante)
+_WEIGHTED_SOURCES = (
+    ("coalesce(d.title, '')", "A"),
+    ("coalesce((SELECT string_agg(k.keyword, ' ') FROM document_keywords k WHERE k.document_id = d.id), '')", "A"),
+    ("coalesce((SELECT string_agg(a.name, ' ') FROM document_authors a WHERE a.document_id = d.id), '')", "B"),
+    ("coalesce(d.field, '')", "B"),
+    ("coalesce(d.abstract, '')", "C"),
+    ("coalesce(d.full_text, '')", "D"),  # texto do PDF, ver app/text_extraction.py
+)
+
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('{config}', {source}), '{weight}')"
+    for source, weight in _WEIGHTED_SOURCES
+    for config in SEARCH_CONFIGS
+)
+
+
+def _regconfig(name: str):
+    return literal_column(f"'{name}'::regconfig")
+
+
+def search_query(q: str):
+    """Monta o tsquery (português OR inglês) a partir do texto digitado pelo usuário."""
+    tsquery = None
+    for config in SEARCH_CONFIGS:
+        part = func.websearch_to_tsquery(_regconfig(config), q)
+        tsquery = part if tsquery is None else tsquery.op("||")(part)
+    return tsquery
+
+
+def search_filter(tsquery):
+    return Document.search_vector.op("@@")(tsquery)
+
+
+def search_rank(tsquery):
+    # normalização 32: rank / (rank + 1), mantém o valor entre 0 e 1
+    return func.ts_rank_cd(Document.search_vector, tsquery, 32)
+
+
+def refresh_search_vectors(db: Session, document_ids: list[int]):
+    """Recalcula o search_vector dos documentos informados (usar antes do commit)."""
+    if not document_ids:
+        return
+    db.execute(
+        text(f"UPDATE documents AS d SET search_vector = {SEARCH_VECTOR_SQL} WHERE d.id = ANY(:ids)"),
+        {"ids": list(document_ids)},
+    )
@@ -0,0 +1,545 @@
+"""
+Documentos parecidos: vizinhos mais próximos por similaridade de cosseno entre vetores
+TF-IDF de título, resumo, keywords e área.
+
+Os SIMILARITY_TOP_K vizinhos de cada documento ficam gravados em document_similarities,
+então GET /documents/{id}/similar lê k linhas pelo índice, sem calcular nada.
+
+As rotas que criam, editam ou excluem documentos gravam o id em similarity_queue na mesma
+transação. Um único atualizador (trava consultiva do Postgres; nos outros processos a
+thread só tenta a trava a cada ciclo) mantém a matriz esparsa do acervo em memória e, a
+cada lote da fila:
+  - acrescenta as linhas dos documentos alterados à matriz, num bloco novo, e marca as
+    antigas como mortas (as demais linhas não são recalculadas nem copiadas);
+  - calcula a similaridade deles com todo o acervo numa multiplicação esparsa;
+  - corrige só as listas afetadas: a do próprio documento e as de quem o ganha, perde
+    ou o vê mudar de posição.
+Os blocos são juntados de tempos em tempos (muitos blocos ou muitas linhas mortas).
+Cada linha e cada lista ficam com o IDF da época em que foram calculadas; --rebuild
+recalcula tudo com o IDF atual.
+
+Com vários workers do uvicorn, alterações feitas nos workers que não têm a trava esperam
+até SIMILARITY_POLL segundos.
+
+    python -m app.similarity              # atualizador em processo separado (SIMILARITY_UPDATER=0 na API)
+    python -m app.similarity --rebuild    # recalcula todos os vizinhos
+"""
+import argparse
+import itertools
+import logging
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models.document_similarity import DocumentSimilarity
+from app.models.similarity_queue import SimilarityQueue
+from app.utils import normalize_keyword
+
+SIMILARITY_UPDATER = int(os.getenv("SIMILARITY_UPDATER", "1"))
+SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "20"))
+SIMILARITY_MIN_SCORE = float(os.getenv("SIMILARITY_MIN_SCORE", "0.05"))
+SIMILARITY_BATCH_SIZE = int(os.getenv("SIMILARITY_BATCH_SIZE", "500"))
+SIMILARITY_POLL = float(os.getenv("SIMILARITY_POLL", "30"))
+
+# campos de DocumentUpdate que mudam o vetor do documento
+SIMILARITY_FIELDS = {"title", "abstract", "field", "keywords"}
+
+# quantas vezes cada ocorrência de um termo conta, por campo
+_FIELD_WEIGHTS = {"title": 2, "keywords": 2, "field": 1, "abstract": 1}
+
+# tamanho (documentos x consultas) de cada bloco denso de similaridades: ~16 MB em float32
+_BLOCK_CELLS = 4_000_000
+
+# a matriz é juntada num bloco só quando passa disso, ou quando 1/4 das linhas está morta
+_MAX_MATRIX_BLOCKS = 32
+
+# chave da trava consultiva que elege o atualizador
+_LOCK_KEY = 815_274_031
+
+_TOKEN = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = {
+    "que", "para", "com", "uma", "uns", "umas", "dos", "das", "nos", "nas", "por", "pelo", "pela",
+    "pelos", "pelas", "como", "mais", "sobre", "entre", "sua", "seu", "suas", "seus", "este", "esta",
+    "estes", "estas", "esse", "essa", "isso", "isto", "ser", "sao", "foi", "foram", "tem", "ter",
+    "tambem", "quando", "onde", "qual", "quais", "sem", "sob", "ate", "apos", "ainda", "muito",
+    "the", "and", "for", "with", "from", "this", "that", "are", "was", "were", "its", "into",
+}
+
+_NO_IDS = np.zeros(0, dtype=np.int64)
+_NO_SCORES = np.zeros(0, dtype=np.float32)
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [token for token in _TOKEN.findall(normalize_keyword(value))
+            if token not in _STOPWORDS and not token.isdigit()]
+
+
+def term_counts(title: str, abstract: str | None, field: str | None, keywords: str | None) -> Counter:
+    counts = Counter()
+    for name, value in (("title", title), ("abstract", abstract), ("field", field), ("keywords", keywords)):
+        for token in tokenize(value):
+            counts[token] += _FIELD_WEIGHTS[name]
+    return counts
+
+
+def _widen(block, columns: int):
+    """A mesma matriz CSR com mais colunas (termos novos no vocabulário), sem copiar os dados."""
+    if block.shape[1] == columns:
+        return block
+    return sparse.csr_matrix((block.data, block.indices, block.indptr), shape=(block.shape[0], columns))
+
+
+def enqueue_similarity_update(db: Session, document_ids):
+    """Agenda o recálculo dos vizinhos; vale quando a transação de `db` fizer commit."""
+    rows = [{"document_id": document_id} for document_id in document_ids]
+    if rows:
+        db.execute(insert(SimilarityQueue), rows)
+
+
+def _load_documents(db: Session, document_ids=None):
+    """(id, contagem de termos) dos documentos (todos, se document_ids for None)."""
+    where = "" if document_ids is None else "WHERE d.id = ANY(:ids)"
+    result = db.execute(text(f"""
+        SELECT d.id, d.title, d.abstract, d.field, string_agg(k.keyword, ' ') AS keywords
+        FROM documents d
+        LEFT JOIN document_keywords k ON k.document_id = d.id
+        {where}
+        GROUP BY d.id
+    """), {"ids": list(document_ids or [])}, execution_options={"yield_per": 2000})
+    for document_id, title, abstract, field, keywords in result:
+        yield document_id, term_counts(title, abstract, field, keywords)
+
+
+class SimilarityIndex:
+    """Vetores de termos do acervo e listas de vizinhos, em memória."""
+
+    def __init__(self, top_k: int = SIMILARITY_TOP_K, min_score: float = SIMILARITY_MIN_SCORE):
+        self.top_k = top_k
+        self.min_score = min_score
+        self.vocabulary: dict[str, int] = {}
+        self.df = np.zeros(1024, dtype=np.int64)  # documentos por termo
+        self.vectors: dict[int, tuple[np.ndarray, np.ndarray]] = {}  # id -> (termos, 1 + log(tf))
+        self.neighbours: dict[int, tuple[np.ndarray, np.ndarray]] = {}  # id -> (ids, scores decrescentes)
+        self.referrers: dict[int, set[int]] = {}  # id -> documentos que o têm entre os vizinhos
+        # matriz TF-IDF (linhas normalizadas) em blocos de linhas, mantida entre os lotes
+        self._blocks: list = []
+        self._offsets = _NO_IDS  # primeira linha de cada bloco
+        self._row_ids = _NO_IDS  # id do documento de cada linha
+        self._alive = np.zeros(0, dtype=bool)  # False: documento excluído ou linha substituída
+        self._rows: dict[int, int] = {}  # id -> linha atual
+        self._row_thresholds = _NO_SCORES  # score mínimo para entrar na lista de cada linha
+
+    @classmethod
+    def load(cls, db: Session) -> "SimilarityIndex":
+        """Monta os vetores a partir dos documentos e lê as listas já gravadas."""
+        index = cls()
+        for document_id, counts in _load_documents(db):
+            index.set_vector(document_id, counts)
+        index._reset_matrix()
+
+        result = db.execute(
+            text("SELECT document_id, similar_id, score FROM document_similarities ORDER BY document_id, score DESC"),
+            execution_options={"yield_per": 10000},
+        )
+        for document_id, rows in itertools.groupby(result, key=lambda row: row[0]):
+            rows = list(rows)
+            index._set_neighbours(
+                document_id,
+                np.array([row[1] for row in rows], dtype=np.int64),
+                np.array([row[2] for row in rows], dtype=np.float32),
+            )
+        return index
+
+    def set_vector(self, document_id: int, counts: Counter):
+        self.remove_vector(document_id)
+        terms = np.fromiter((self._term(term) for term in counts), dtype=np.int32, count=len(counts))
+        values = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        order = np.argsort(terms)
+        self.vectors[document_id] = (terms[order], values[order])
+        self.df[terms] += 1
+
+    def remove_vector(self, document_id: int):
+        old = self.vectors.pop(document_id, None)
+        if old is not None:
+            self.df[old[0]] -= 1
+
+    def _term(self, term: str) -> int:
+        index = self.vocabulary.get(term)
+        if index is None:
+            index = self.vocabulary[term] = len(self.vocabulary)
+            if index >= len(self.df):
+                self.df = np.concatenate([self.df, np.zeros(len(self.df), dtype=np.int64)])
+        return index
+
+    def _weigh(self, document_ids: list[int]):
+        """Linhas TF-IDF normalizadas dos documentos, com o IDF atual."""
+        vectors = [self.vectors[document_id] for document_id in document_ids]
+        lengths = np.fromiter((len(terms) for terms, _ in vectors), dtype=np.int64, count=len(vectors))
+        indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if indptr[-1]:
+            indices = np.concatenate([terms for terms, _ in vectors])
+            data = np.concatenate([values for _, values in vectors])
+        else:
+            indices, data = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        vocabulary_size = len(self.vocabulary)
+        idf = (np.log((1 + len(self.vectors)) / (1 + self.df[:vocabulary_size])) + 1).astype(np.float32)
+        data = data * idf[indices]
+        rows = np.repeat(np.arange(len(vectors)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(vectors)))
+        norms[norms == 0] = 1  # documento sem termos
+        data /= np.repeat(norms, lengths).astype(np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(vectors), vocabulary_size))
+
+    def _reset_matrix(self):
+        """Monta a matriz do acervo inteiro num bloco só, com o IDF atual."""
+        self._blocks, self._offsets = [], _NO_IDS
+        self._row_ids, self._alive, self._rows = _NO_IDS, np.zeros(0, dtype=bool), {}
+        self._row_thresholds = _NO_SCORES
+        self._append_rows(list(self.vectors))
+
+    def _append_rows(self, document_ids: list[int]):
+        """Acrescenta as linhas dos documentos num bloco novo; as linhas anteriores deles morrem."""
+        self._drop_rows(document_ids)
+        if not document_ids:
+            return
+        start = len(self._row_ids)
+        self._blocks.append(self._weigh(document_ids))
+        self._offsets = np.append(self._offsets, start)
+        self._row_ids = np.concatenate([self._row_ids, np.array(document_ids, dtype=np.int64)])
+        self._alive = np.concatenate([self._alive, np.ones(len(document_ids), dtype=bool)])
+        thresholds = np.fromiter(map(self._threshold, document_ids), dtype=np.float32, count=len(document_ids))
+        self._row_thresholds = np.concatenate([self._row_thresholds, thresholds])
+        self._rows.update((document_id, start + position) for position, document_id in enumerate(document_ids))
+
+    def _drop_rows(self, document_ids):
+        for document_id in document_ids:
+            row = self._rows.pop(document_id, None)
+            if row is not None:
+                self._alive[row] = False
+
+    def _compact(self):
+        """Junta os blocos descartando as linhas mortas, quando eles acumulam demais."""
+        dead = len(self._alive) - int(np.count_nonzero(self._alive))
+        if len(self._blocks) <= _MAX_MATRIX_BLOCKS and dead * 4 <= len(self._alive):
+            return
+        keep = np.flatnonzero(self._alive)
+        columns = len(self.vocabulary)
+        matrix = sparse.vstack([_widen(block, columns) for block in self._blocks], format="csr")[keep]
+        self._blocks, self._offsets = [matrix], np.zeros(1, dtype=np.int64)
+        self._row_ids = self._row_ids[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_thresholds = self._row_thresholds[keep]
+        self._rows = {document_id: row for row, document_id in enumerate(self._row_ids.tolist())}
+
+    def _select(self, rows: np.ndarray):
+        """Submatriz com as linhas `rows`, nessa ordem."""
+        columns = len(self.vocabulary)
+        block_of = np.searchsorted(self._offsets, rows, side="right") - 1
+        parts, order = [], []
+        for block in np.unique(block_of).tolist():
+            mask = block_of == block
+            parts.append(_widen(self._blocks[block][rows[mask] - self._offsets[block]], columns))
+            order.append(np.flatnonzero(mask))
+        selected = sparse.vstack(parts, format="csr")
+        return selected[np.argsort(np.concatenate(order))]
+
+    def _scores(self, queries) -> np.ndarray:
+        """Similaridades densas (linhas da matriz x consultas); linhas mortas valem 0."""
+        columns = len(self.vocabulary)
+        scores = np.vstack([(_widen(block, columns) @ queries.T).toarray() for block in self._blocks])
+        scores[~self._alive] = 0
+        return scores
+
+    def _top_k(self, rows: np.ndarray):
+        """
+        Vizinhos das linhas `rows`, calculados em blocos densos de (acervo x consultas).
+        Gera (linha, similaridades com o acervo, ids dos vizinhos, scores).
+        """
+        ids = self._row_ids
+        k = min(self.top_k, int(np.count_nonzero(self._alive)) - 1)
+        step = max(1, _BLOCK_CELLS // max(len(ids), 1))
+        for start in range(0, len(rows), step):
+            chunk = rows[start:start + step]
+            scores = self._scores(self._select(chunk))
+            scores[chunk, np.arange(len(chunk))] = 0  # o próprio documento
+            if k <= 0:
+                for column, row in enumerate(chunk):
+                    yield row, scores[:, column], _NO_IDS, _NO_SCORES
+                continue
+
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            top_scores = np.take_along_axis(scores, top, axis=0)
+            order = np.argsort(-top_scores, axis=0, kind="stable")
+            top = np.take_along_axis(top, order, axis=0)
+            top_scores = np.take_along_axis(top_scores, order, axis=0)
+            for column, row in enumerate(chunk):
+                # score 0: sem termo em comum (ou linha morta)
+                keep = (top_scores[:, column] >= self.min_score) & (top_scores[:, column] > 0)
+                yield row, scores[:, column], ids[top[keep, column]], top_scores[keep, column]
+
+    def _set_neighbours(self, document_id: int, ids: np.ndarray, scores: np.ndarray):
+        old = self.neighbours.pop(document_id, None)
+        if old is not None:
+            for similar_id in old[0].tolist():
+                self.referrers.get(similar_id, set()).discard(document_id)
+        if len(ids):
+            self.neighbours[document_id] = (ids, scores.astype(np.float32))
+            for similar_id in ids.tolist():
+                self.referrers.setdefault(similar_id, set()).add(document_id)
+        row = self._rows.get(document_id)
+        if row is not None:
+            self._row_thresholds[row] = self._threshold(document_id)
+
+    def _offer(self, document_id: int, candidate_id: int, score: float) -> bool:
+        """
+        Atualiza a posição de candidate_id na lista de document_id. Retorna False quando
+        a lista precisa ser recalculada inteira (o candidato perdeu score e outro documento
+        pode ter passado a merecer o lugar).
+        """
+        ids, scores = self.neighbours.get(document_id, (_NO_IDS, _NO_SCORES))
+        member = ids == candidate_id
+        if member.any():
+            if score < scores[member][0]:
+                return False
+            ids, scores = ids[~member], scores[~member]
+        if score >= self.min_score:
+            position = np.searchsorted(-scores, -score)
+            ids = np.insert(ids, position, candidate_id)[:self.top_k]
+            scores = np.insert(scores, position, score)[:self.top_k]
+        self._set_neighbours(document_id, ids, scores)
+        return True
+
+    def _threshold(self, document_id: int) -> float:
+        """Score mínimo para entrar na lista (o do k-ésimo vizinho, se ela estiver cheia)."""
+        neighbours = self.neighbours.get(document_id)
+        if neighbours is not None and len(neighbours[0]) >= self.top_k:
+            return float(neighbours[1][-1])
+        return self.min_score
+
+    def update(self, changed: dict[int, Counter], deleted: set[int]) -> set[int]:
+        """Aplica documentos novos/alterados e excluídos; retorna os ids cujas listas mudaram."""
+        refill = set()
+        for document_id in deleted:
+            self.remove_vector(document_id)
+            self._set_neighbours(document_id, _NO_IDS, _NO_SCORES)
+            refill |= self.referrers.pop(document_id, set())
+        for document_id, counts in changed.items():
+            self.set_vector(document_id, counts)
+
+        self._drop_rows(deleted)
+        self._append_rows(list(changed))
+        self._compact()
+        ids, positions = self._row_ids, self._rows
+        thresholds = self._row_thresholds.copy()
+        touched = set()
+
+        rows = np.array([positions[document_id] for document_id in changed], dtype=np.int64)
+        for row, scores, neighbour_ids, neighbour_scores in self._top_k(rows):
+            document_id = int(ids[row])
+            self._set_neighbours(document_id, neighbour_ids, neighbour_scores)
+            touched.add(document_id)
+
+            # listas em que o documento passa a entrar ou em que já estava
+            candidates = set(np.flatnonzero((scores >= thresholds) & (scores > 0)).tolist())
+            candidates |= {positions[other] for other in self.referrers.get(document_id, ()) if other in positions}
+            candidates.discard(row)
+            for candidate in candidates:
+                other = int(ids[candidate])
+                if other in changed:
+                    continue  # recalculada inteira neste mesmo lote
+                if self._offer(other, document_id, float(scores[candidate])):
+                    touched.add(other)
+                else:
+                    refill.add(other)
+
+        refill = [document_id for document_id in refill if document_id in positions and document_id not in changed]
+        rows = np.array([positions[document_id] for document_id in refill], dtype=np.int64)
+        for row, _, neighbour_ids, neighbour_scores in self._top_k(rows):
+            self._set_neighbours(int(ids[row]), neighbour_ids, neighbour_scores)
+            touched.add(int(ids[row]))
+        return touched
+
+    def rebuild(self):
+        """Recalcula a matriz e todas as listas com o IDF atual."""
+        self.neighbours.clear()
+        self.referrers.clear()
+        self._reset_matrix()
+        for row, _, neighbour_ids, neighbour_scores in self._top_k(np.arange(len(self._row_ids))):
+            self._set_neighbours(int(self._row_ids[row]), neighbour_ids, neighbour_scores)
+
+
+def _insert_neighbours(db: Session, index: SimilarityIndex, document_ids, batch_size: int = 5000):
+    rows = (
+        {"document_id": document_id, "similar_id": similar_id, "score": score}
+        for document_id in document_ids
+        for similar_id, score in zip(*(array.tolist() for array in index.neighbours.get(document_id, (_NO_IDS, _NO_SCORES))))
+    )
+    while batch := list(itertools.islice(rows, batch_size)):
+        db.execute(insert(DocumentSimilarity), batch)
+
+
+def rebuild(db: Session) -> SimilarityIndex:
+    """Recalcula todos os vizinhos com o IDF atual e descarta a fila até aqui."""
+    last_id = db.execute(text("SELECT max(id) FROM similarity_queue")).scalar()
+    index = SimilarityIndex()
+    for document_id, counts in _load_documents(db):
+        index.set_vector(document_id, counts)
+    index.rebuild()
+
+    db.execute(text("DELETE FROM document_similarities"))
+    _insert_neighbours(db, index, list(index.neighbours))
+    if last_id is not None:
+        db.execute(text("DELETE FROM similarity_queue WHERE id <= :id"), {"id": last_id})
+    db.commit()
+    return index
+
+
+class SimilarityUpdater:
+    """Thread que consome a fila no processo que detém a trava; wake() antecipa o próximo ciclo."""
+
+    def __init__(self, enabled: bool = bool(SIMILARITY_UPDATER)):
+        self.enabled = enabled
+        self.index: SimilarityIndex | None = None
+        self._lock_connection = None
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def acquire(self) -> bool:
+        """Obtém (ou confirma) a trava do atualizador numa conexão dedicada."""
+        if self._lock_connection is not None:
+            # a trava vale enquanto a sessão existir; uma conexão caída levanta erro aqui
+            self._lock_connection.exec_driver_sql("SELECT 1")
+            self._lock_connection.commit()
+            return True
+
+        connection = engine.connect()
+        locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY}).scalar()
+        connection.commit()
+        if not locked:
+            connection.close()
+            return False
+        self._lock_connection = connection
+        return True
+
+    def release(self):
+        self.index = None
+        if self._lock_connection is not None:
+            # devolver ao pool manteria a sessão (e a trava); a conexão é descartada
+            self._lock_connection.invalidate()
+            self._lock_connection.close()
+            self._lock_connection = None
+
+    def process_batch(self) -> int:
+        """Processa um lote da fila. Retorna quantas entradas foram consumidas (0 = nada a fazer)."""
+        if not self.acquire():
+            return 0
+
+        with SessionLocal() as db:
+            rows = db.execute(
+                text("SELECT id, document_id FROM similarity_queue ORDER BY id LIMIT :limit"),
+                {"limit": SIMILARITY_BATCH_SIZE},
+            ).all()
+            if not rows:
+                return 0
+
+            try:
+                if any(document_id is None for _, document_id in rows):
+                    self.index = rebuild(db)
+                    return len(rows)
+
+                if self.index is None:
+                    self.index = SimilarityIndex.load(db)
+                document_ids = {document_id for _, document_id in rows}
+                changed = dict(_load_documents(db, document_ids))
+                touched = self.index.update(changed, document_ids - changed.keys())
+
+                db.execute(
+                    text("DELETE FROM document_similarities WHERE document_id = ANY(:ids)"),
+                    {"ids": list(touched)},
+                )
+                _insert_neighbours(db, self.index, touched)
+                db.execute(text("DELETE FROM similarity_queue WHERE id = ANY(:ids)"), {"ids": [row[0] for row in rows]})
+                db.commit()
+            except BaseException:
+                # a matriz em memória já foi alterada; é recarregada do banco no próximo lote
+                self.index = None
+                raise
+        return len(rows)
+
+    def start(self):
+        if self._thread is not None or not self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="similarity-updater", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.release()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # lote cheio: provavelmente há mais na fila, não espera
+                if self.process_batch() >= SIMILARITY_BATCH_SIZE:
+                    continue
+            except Exception:
+                logger.exception("erro ao atualizar os documentos parecidos")
+                self.release()
+            self._wake.wait(SIMILARITY_POLL)
+            self._wake.clear()
+
+
+similarity_updater = SimilarityUpdater()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Atualizador dos documentos parecidos")
+    parser.add_argument("--rebuild", action="store_true", help="recalcula todos os vizinhos e sai")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    updater = SimilarityUpdater(enabled=True)
+
+    if args.rebuild:
+        if updater.acquire():
+            with SessionLocal() as db:
+                index = rebuild(db)
+            updater.release()
+            print(f"{len(index.vectors)} documentos, {len(index.neighbours)} com vizinhos")
+        else:
+            # outro processo mantém a matriz em memória; ele recalcula ao consumir a fila
+            with SessionLocal() as db:
+                enqueue_similarity_update(db, [None])
+                db.commit()
+            print("atualizador em execução em outro processo: recálculo agendado")
+        raise SystemExit(0)
+
+    updater.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        updater.stop()
@@ -0,0 +1,182 @@
+import mimetypes
+import os
+import tempfile
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+from minio.datatypes import Part
+from minio.error import S3Error
+
+from app.minio_client import client, presign_client, BUCKET
+from app.profiling import count_storage_bytes, storage_timer
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Limites de upload (bytes)
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(500 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = max(int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+MAX_MULTIPART_PARTS = 10000  # limite do S3/MinIO
+
+# validade das URLs pré-assinadas (modo direto)
+PRESIGNED_URL_EXPIRES = int(os.getenv("PRESIGNED_URL_EXPIRES", "900"))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class ObjectTooLarge(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int):
+    """
+    Interpreta o header Range (apenas um intervalo de bytes).
+    Retorna (início, tamanho) ou None quando o header deve ser ignorado.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if size == 0:
+        # nenhum intervalo de um arquivo vazio é satisfazível (nem o sufixo bytes=-N)
+        raise RangeNotSatisfiable()
+
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if start == "":
+            # sufixo: últimos N bytes
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            length = min(length, size)
+            return size - length, length
+
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    end = min(end, size - 1)
+    return start, end - start + 1
+
+
+def content_type_for(stat, object_name: str) -> str:
+    """Content-type gravado no objeto; usa a extensão só quando o MinIO não tem o dado."""
+    content_type = stat.content_type
+    if content_type and content_type != "application/octet-stream":
+        return content_type
+    guessed, _ = mimetypes.guess_type(object_name)
+    return guessed or "application/octet-stream"
+
+
+def is_not_modified(request_headers, etag: str, last_modified) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def object_headers(stat, object_name: str) -> dict:
+    headers = {
+        "ETag": f'"{stat.etag}"',
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"inline; filename={object_name.split('/')[-1]}",
+        "Cache-Control": "public, max-age=3600",
+    }
+    if stat.last_modified:
+        headers["Last-Modified"] = format_datetime(stat.last_modified, usegmt=True)
+    return headers
+
+
+def iter_object(object_name: str, offset: int = 0, length: int = 0):
+    """Lê o objeto do MinIO em blocos, sem carregar o arquivo inteiro em memória."""
+    response = client.get_object(BUCKET, object_name, offset=offset, length=length)
+    try:
+        chunks = response.stream(STREAM_CHUNK_SIZE)
+        while True:
+            # o get_object (uma chamada) só espera os headers; a leitura do corpo também é
+            # tempo de MinIO, mas da mesma chamada
+            with storage_timer(calls=0):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            count_storage_bytes(len(chunk))
+            yield chunk
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def download_object(object_name: str, max_size: int, spool_size: int = 8 * 1024 * 1024):
+    """
+    Copia o objeto em blocos para um arquivo temporário posicionado no início (em memória
+    até `spool_size`). Levanta ObjectTooLarge se passar de `max_size` bytes.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    size = 0
+    try:
+        for chunk in iter_object(object_name):
+            size += len(chunk)
+            if size > max_size:
+                raise ObjectTooLarge(f"arquivo maior que {max_size} bytes")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def presigned_put_url(object_name: str) -> str:
+    return presign_client.presigned_put_object(BUCKET, object_name, expires=timedelta(seconds=PRESIGNED_URL_EXPIRES))
+
+
+def presigned_get_url(object_name: str) -> str:
+    return presign_client.presigned_get_object(
+        BUCKET, object_name,
+        expires=timedelta(seconds=PRESIGNED_URL_EXPIRES),
+        response_headers={"response-content-disposition": f"inline; filename={object_name.split('/')[-1]}"},
+    )
+
+
+def is_missing_object(error: Exception) -> bool:
+    return isinstance(error, S3Error) and error.code in ("NoSuchKey", "NoSuchBucket", "NoSuchObject")
+
+
+# Multipart upload: o SDK do MinIO só expõe essas operações como métodos internos.
+
+def create_multipart_upload(object_name: str, content_type: str) -> str:
+    return client._create_multipart_upload(BUCKET, object_name, {"Content-Type": content_type})
+
+
+def upload_part(object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+    return client._upload_part(BUCKET, object_name, data, None, upload_id, part_number)
+
+
+def list_parts(object_name: str, upload_id: str) -> list:
+    parts = []
+    marker = None
+    while True:
+        result = client._list_parts(BUCKET, object_name, upload_id, part_number_marker=marker)
+        parts.extend(result.parts)
+        if not result.is_truncated:
+            return parts
+        marker = result.next_part_number_marker
+
+
+def complete_multipart_upload(object_name: str, upload_id: str, parts: list):
+    parts = [Part(part.part_number, part.etag) for part in sorted(parts, key=lambda p: p.part_number)]
+    client._complete_multipart_upload(BUCKET, object_name, upload_id, parts)
+
+
+def abort_multipart_upload(object_name: str, upload_id: str):
+    client._abort_multipart_upload(BUCKET, object_name, upload_id)
@@ -0,0 +1,212 @@
+"""
+Coletor de objetos órfãos do bucket: arquivos enviados que nunca viraram documento
+(formulários abandonados) e sobras de remoções que falharam.
+
+A listagem do bucket é percorrida em lotes: para cada lote, consultas com IN (...) descobrem
+quais arquivos ainda são referenciados por documents.file_url, então a memória usada é a
+de um lote, qualquer que seja o número de objetos. A comparação é pelo nome do objeto no
+fim da URL, não pela URL inteira: URLs gravadas com outro host ou outro PUBLIC_URL
+continuam protegendo o arquivo.
+
+Com --delete, antes de apagar qualquer coisa o coletor confere que o arquivo de algum
+documento existe no bucket com o nome que a URL indica: se há documentos mas nenhum deles
+aponta para o bucket configurado (bucket errado, URLs num formato desconhecido), a coleta
+roda só como relatório em vez de esvaziar o bucket.
+
+Não são considerados órfãos:
+  - objetos mais novos que o período de carência (uploads em andamento);
+  - miniaturas (<objeto>.thumb.jpg) cujo arquivo ainda é referenciado;
+  - objetos de sessões de upload ainda não concluídas (as abandonadas são descartadas por
+    app/upload_sweeper.py);
+  - objetos que já estão na fila de remoção (storage_outbox).
+
+    python -m app.storage_gc                 # dry-run: só relata
+    python -m app.storage_gc --delete --grace-hours 48
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from minio.deleteobjects import DeleteObject
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.minio_client import client, BUCKET
+from app.models.document import Document
+from app.models.storage_outbox import StorageOutbox
+from app.models.upload_session import UploadSession
+from app.storage import is_missing_object
+from app.thumbnails import THUMBNAIL_SUFFIX
+from app.utils import object_name_from_url
+
+GC_BATCH_SIZE = int(os.getenv("GC_BATCH_SIZE", "1000"))
+GC_GRACE_HOURS = float(os.getenv("GC_GRACE_HOURS", "24"))
+# documentos cujos arquivos são procurados no bucket antes de apagar qualquer coisa
+GC_PREFLIGHT_SAMPLE = 20
+
+
+def _batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _source_name(object_name: str) -> str:
+    """Arquivo ao qual o objeto pertence (a miniatura pertence ao PDF)."""
+    if object_name.endswith(THUMBNAIL_SUFFIX):
+        return object_name[:-len(THUMBNAIL_SUFFIX)]
+    return object_name
+
+
+# último segmento da URL (mesma expressão do índice ix_documents_file_url_basename)
+_file_url_basename = func.regexp_replace(Document.file_url, "^.*/", "")
+
+
+def _referenced_names(db, names: set[str]) -> set[str]:
+    """Nomes de `names` que algum documento referencia, qualquer que seja o host da URL."""
+    by_basename: dict[str, list[str]] = {}
+    for name in names:
+        by_basename.setdefault(name.rsplit("/", 1)[-1], []).append(name)
+    file_urls = db.execute(
+        select(Document.file_url).where(_file_url_basename.in_(list(by_basename)))
+    ).scalars().all()
+    # o último segmento só pré-seleciona; a URL tem de terminar com o nome completo
+    return {
+        name
+        for url in file_urls
+        for name in by_basename.get(url.rsplit("/", 1)[-1], [])
+        if url.endswith(f"/{name}")
+    }
+
+
+def find_orphans(db, objects: list) -> tuple[list, int]:
+    """
+    Filtra do lote os objetos que ninguém referencia (3 queries por lote). Retorna
+    (órfãos, quantos objetos do lote pertencem a algum documento).
+    """
+    sources = {obj.object_name: _source_name(obj.object_name) for obj in objects}
+    referenced = _referenced_names(db, set(sources.values()))
+    in_use = sum(1 for source in sources.values() if source in referenced)
+
+    names = list(sources)
+    referenced |= set(db.execute(
+        select(UploadSession.object_name).where(
+            UploadSession.object_name.in_(list(set(sources.values()))),
+            UploadSession.completed.is_(False),
+            UploadSession.aborted.is_(False),
+        )
+    ).scalars().all())
+    queued = set(db.execute(
+        select(StorageOutbox.object_name).where(StorageOutbox.object_name.in_(names))
+    ).scalars().all())
+
+    orphans = [
+        obj for obj in objects
+        if sources[obj.object_name] not in referenced and obj.object_name not in queued
+    ]
+    return orphans, in_use
+
+
+def preflight(db) -> str | None:
+    """
+    Confere que as URLs dos documentos apontam para este bucket: algum dos documentos mais
+    recentes tem de ter o arquivo lá. Retorna o motivo para não apagar, ou None.
+    """
+    file_urls = db.execute(
+        select(Document.file_url).order_by(Document.id.desc()).limit(GC_PREFLIGHT_SAMPLE)
+    ).scalars().all()
+    if not file_urls:
+        return None  # nenhum documento: nada a proteger
+    for url in file_urls:
+        try:
+            client.stat_object(BUCKET, object_name_from_url(url))
+            return None
+        except Exception as e:
+            if not is_missing_object(e):
+                return f"erro ao conferir o arquivo de um documento no bucket: {e}"
+    return (f"nenhum dos {len(file_urls)} documentos mais recentes tem o arquivo no bucket {BUCKET}; "
+            "remoções canceladas")
+
+
+def _remove(names: list[str]) -> list[str]:
+    """Remove em lote; retorna as mensagens das remoções que falharam."""
+    errors = client.remove_objects(BUCKET, [DeleteObject(name) for name in names])
+    return [f"{error.name}: {error.code} {error.message}" for error in errors]
+
+
+def collect(delete: bool = False, grace_hours: float = GC_GRACE_HOURS, prefix: str | None = None,
+            batch_size: int = GC_BATCH_SIZE, on_orphan=None) -> dict:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    report = {"scanned": 0, "recent": 0, "referenced": 0, "orphans": 0, "orphan_bytes": 0, "deleted": 0,
+              "errors": []}
+    def remove(names: list[str]):
+        for start in range(0, len(names), 1000):  # limite do DeleteObjects
+            chunk = names[start:start + 1000]
+            errors = _remove(chunk)
+            report["deleted"] += len(chunk) - len(errors)
+            report["errors"].extend(errors[:max(0, 1000 - len(report["errors"]))])
+
+    # list_objects pagina a listagem internamente (1000 chaves por chamada)
+    listing = client.list_objects(BUCKET, prefix=prefix, recursive=True)
+    with SessionLocal() as db:
+        if delete:
+            problem = preflight(db)
+            db.rollback()
+            if problem:
+                report["errors"].append(problem)
+                delete = False  # segue só relatando
+        for batch in _batches(listing, batch_size):
+            report["scanned"] += len(batch)
+            candidates = []
+            for obj in batch:
+                if obj.is_dir:
+                    continue
+                if obj.last_modified is None or obj.last_modified > cutoff:
+                    report["recent"] += 1
+                    continue
+                candidates.append(obj)
+            if not candidates:
+                continue
+
+            orphans, in_use = find_orphans(db, candidates)
+            db.rollback()  # só leitura; não segura a transação entre lotes
+            report["referenced"] += in_use
+            report["orphans"] += len(orphans)
+            report["orphan_bytes"] += sum(obj.size or 0 for obj in orphans)
+            for obj in orphans:
+                if on_orphan:
+                    on_orphan(obj)
+
+            if delete and orphans:
+                remove([obj.object_name for obj in orphans])
+
+    return report
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Remove objetos do bucket que nenhum documento referencia")
+    parser.add_argument("--delete", action="store_true", help="apaga os órfãos (sem isso, só relata)")
+    parser.add_argument("--grace-hours", type=float, default=GC_GRACE_HOURS,
+                        help="ignora objetos mais novos que isso")
+    parser.add_argument("--prefix", help="restringe a um prefixo do bucket")
+    parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE)
+    parser.add_argument("--list", action="store_true", help="imprime o nome de cada órfão")
+    args = parser.parse_args()
+
+    def print_orphan(obj):
+        print(f"{obj.object_name}\t{obj.size}\t{obj.last_modified.isoformat()}", file=sys.stderr)
+
+    report = collect(args.delete, args.grace_hours, args.prefix, args.batch_size,
+                     on_orphan=print_orphan if args.list else None)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    sys.exit(1 if report["errors"] else 0)
@@ -0,0 +1,141 @@
+"""
+Remoção assíncrona de objetos do bucket (outbox transacional).
+
+As rotas não apagam arquivos no MinIO: gravam o nome do objeto em storage_outbox na mesma
+transação que deixa de referenciá-lo. Se o commit falhar, nada é apagado; se o MinIO
+estiver fora, a requisição não espera nem falha. Uma thread esvazia a fila em lotes com
+remove_objects (até 1000 chaves por chamada), repetindo as falhas com espera exponencial.
+
+Vários processos podem rodar o drenador ao mesmo tempo (FOR UPDATE SKIP LOCKED):
+
+    python -m app.storage_outbox
+"""
+import logging
+import os
+import threading
+
+from minio.deleteobjects import DeleteObject
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.minio_client import client, BUCKET
+from app.models.storage_outbox import StorageOutbox
+
+OUTBOX_BATCH_SIZE = min(int(os.getenv("OUTBOX_BATCH_SIZE", "1000")), 1000)  # limite do DeleteObjects
+OUTBOX_POLL = float(os.getenv("OUTBOX_POLL", "30"))
+OUTBOX_RETRY_DELAY = float(os.getenv("OUTBOX_RETRY_DELAY", "10"))
+OUTBOX_MAX_RETRY_DELAY = float(os.getenv("OUTBOX_MAX_RETRY_DELAY", "3600"))
+
+# a chave já não existir conta como remoção concluída
+_MISSING_CODES = ("NoSuchKey", "NoSuchObject")
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_removal(db: Session, object_names):
+    """Agenda a remoção dos objetos; vale quando a transação de `db` fizer commit."""
+    db.add_all(StorageOutbox(object_name=name) for name in object_names)
+
+
+def _reschedule(db, ids: list[int], errors: dict[int, str]):
+    db.execute(text("""
+        UPDATE storage_outbox
+        SET attempts = attempts + 1,
+            last_error = :error,
+            next_attempt_at = now() + make_interval(secs => least(:delay * power(2, attempts), :max_delay))
+        WHERE id = :id
+    """), [
+        {"id": outbox_id, "error": errors[outbox_id][:1000], "delay": OUTBOX_RETRY_DELAY, "max_delay": OUTBOX_MAX_RETRY_DELAY}
+        for outbox_id in ids
+    ])
+
+
+def drain_batch() -> int:
+    """Processa um lote da fila. Retorna quantas entradas foram tentadas (0 = fila vazia)."""
+    with SessionLocal() as db:
+        rows = db.execute(text("""
+            SELECT id, object_name FROM storage_outbox
+            WHERE next_attempt_at <= now()
+            ORDER BY next_attempt_at, id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        """), {"limit": OUTBOX_BATCH_SIZE}).all()
+        if not rows:
+            return 0
+
+        ids_by_name: dict[str, list[int]] = {}
+        for outbox_id, object_name in rows:
+            ids_by_name.setdefault(object_name, []).append(outbox_id)
+
+        failed: dict[int, str] = {}
+        try:
+            # remove_objects é preguiçoso: os erros só são conhecidos ao consumir o iterador
+            for error in client.remove_objects(BUCKET, [DeleteObject(name) for name in ids_by_name]):
+                if error.code in _MISSING_CODES:
+                    continue
+                for outbox_id in ids_by_name.get(error.name, []):
+                    failed[outbox_id] = f"{error.code}: {error.message}"
+        except Exception as e:
+            failed = {outbox_id: f"{type(e).__name__}: {e}" for outbox_id, _ in rows}
+
+        done = [outbox_id for outbox_id, _ in rows if outbox_id not in failed]
+        if done:
+            db.execute(text("DELETE FROM storage_outbox WHERE id = ANY(:ids)"), {"ids": done})
+        if failed:
+            _reschedule(db, list(failed), failed)
+            logger.warning("%s remoções de objetos falharam e serão repetidas", len(failed))
+        db.commit()
+        return len(rows)
+
+
+class OutboxDrainer:
+    """Thread que esvazia a fila; wake() antecipa o próximo ciclo depois de um commit."""
+
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # lote cheio: provavelmente há mais na fila, não espera
+                if drain_batch() >= OUTBOX_BATCH_SIZE:
+                    continue
+            except Exception:
+                logger.exception("erro ao esvaziar a fila de remoção de objetos")
+            self._wake.wait(OUTBOX_POLL)
+            self._wake.clear()
+
+
+outbox_drainer = OutboxDrainer()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    drainer = OutboxDrainer()
+    drainer.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        drainer.stop()
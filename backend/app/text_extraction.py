@@ -0,0 +1,229 @@
+"""
+Extração do texto dos PDFs em segundo plano, para a busca textual.
+
+Documentos com text_status "pending" formam uma fila no próprio Postgres: cada worker
+reserva um documento por vez (FOR UPDATE SKIP LOCKED, então vários processos podem rodar
+workers ao mesmo tempo), baixa o objeto do MinIO em blocos para um arquivo temporário,
+extrai o texto com pypdf e grava em documents.full_text, que entra no search_vector com
+peso D.
+
+Falhas transitórias (MinIO, banco) são repetidas com espera exponencial até
+TEXT_EXTRACTION_MAX_ATTEMPTS; PDFs inválidos ou arquivos ausentes falham de imediato.
+Um worker que morra no meio do trabalho tem a reserva expirada após
+TEXT_EXTRACTION_LEASE segundos e o documento volta para a fila; como cada reserva conta
+como tentativa, um PDF que derruba o processo (falta de memória, segfault) acaba marcado
+como "failed" em vez de ser reservado para sempre.
+
+Os workers sobem com a API (TEXT_EXTRACTION_WORKERS, 0 desliga) ou em processo separado,
+para não disputar CPU com as requisições:
+
+    python -m app.text_extraction --workers 4
+"""
+import argparse
+import logging
+import os
+import threading
+
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+from sqlalchemy import func, text
+
+from app.crud.document import invalidate_document_caches
+from app.database import SessionLocal
+from app.search import refresh_search_vectors
+from app.storage import ObjectTooLarge, download_object, is_missing_object
+from app.utils import object_name_from_url
+
+TEXT_EXTRACTION_WORKERS = int(os.getenv("TEXT_EXTRACTION_WORKERS", "2"))
+TEXT_EXTRACTION_POLL = float(os.getenv("TEXT_EXTRACTION_POLL", "10"))
+TEXT_EXTRACTION_MAX_ATTEMPTS = int(os.getenv("TEXT_EXTRACTION_MAX_ATTEMPTS", "5"))
+TEXT_EXTRACTION_RETRY_DELAY = float(os.getenv("TEXT_EXTRACTION_RETRY_DELAY", "30"))
+TEXT_EXTRACTION_LEASE = int(os.getenv("TEXT_EXTRACTION_LEASE", "600"))
+TEXT_EXTRACTION_MAX_BYTES = int(os.getenv("TEXT_EXTRACTION_MAX_BYTES", str(100 * 1024 * 1024)))
+# o tsvector do Postgres tem limite de 1 MB; o início do texto basta para a busca
+TEXT_EXTRACTION_MAX_CHARS = int(os.getenv("TEXT_EXTRACTION_MAX_CHARS", "200000"))
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentExtractionError(Exception):
+    """Erro que não se resolve tentando de novo (arquivo ausente, PDF inválido...)."""
+
+
+def reset_text_extraction(document):
+    """Recoloca o documento na fila (usar quando o file_url muda)."""
+    document.full_text = None
+    document.text_status = "pending"
+    document.text_attempts = 0
+    document.text_error = None
+    document.text_next_attempt_at = func.now()
+
+
+def extract_text(fileobj) -> str:
+    try:
+        reader = PdfReader(fileobj)
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise PermanentExtractionError("PDF protegido por senha")
+
+        parts, size = [], 0
+        for page in reader.pages:
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            size += len(page_text)
+            if size >= TEXT_EXTRACTION_MAX_CHARS:
+                break
+    except PdfReadError as e:
+        raise PermanentExtractionError(f"PDF inválido: {e}")
+
+    # o Postgres não aceita NUL em colunas text
+    return "\n".join(parts)[:TEXT_EXTRACTION_MAX_CHARS].replace("\x00", "")
+
+
+def _download(object_name: str):
+    try:
+        return download_object(object_name, TEXT_EXTRACTION_MAX_BYTES)
+    except ObjectTooLarge as e:
+        raise PermanentExtractionError(str(e))
+    except Exception as e:
+        if is_missing_object(e):
+            raise PermanentExtractionError("arquivo não encontrado no armazenamento")
+        raise
+
+
+def _claim(db):
+    # reservas expiradas que já esgotaram as tentativas: o worker morreu em todas elas
+    db.execute(text("""
+        UPDATE documents
+        SET text_status = 'failed',
+            text_error = 'extração interrompida (o worker parou) em todas as tentativas'
+        WHERE text_status = 'processing' AND text_next_attempt_at <= now()
+          AND text_attempts >= :max_attempts
+    """), {"max_attempts": TEXT_EXTRACTION_MAX_ATTEMPTS})
+    return db.execute(text("""
+        UPDATE documents
+        SET text_status = 'processing',
+            text_attempts = text_attempts + 1,
+            text_next_attempt_at = now() + make_interval(secs => :lease)
+        WHERE id = (
+            SELECT id FROM documents
+            WHERE text_status IN ('pending', 'processing') AND text_next_attempt_at <= now()
+              AND text_attempts < :max_attempts
+            ORDER BY text_next_attempt_at
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, file_url, text_attempts
+    """), {"lease": TEXT_EXTRACTION_LEASE, "max_attempts": TEXT_EXTRACTION_MAX_ATTEMPTS}).first()
+
+
+def _finish(db, document_id: int, file_url: str, full_text: str) -> bool:
+    # se o arquivo foi trocado durante a extração, o resultado é descartado
+    result = db.execute(text("""
+        UPDATE documents
+        SET full_text = :full_text, text_status = 'done', text_error = NULL
+        WHERE id = :id AND file_url = :file_url AND text_status = 'processing'
+    """), {"id": document_id, "file_url": file_url, "full_text": full_text})
+    if result.rowcount:
+        refresh_search_vectors(db, [document_id])
+    db.commit()
+    return bool(result.rowcount)
+
+
+def _fail(db, document_id: int, file_url: str, attempts: int, error: str, retry: bool):
+    if retry and attempts < TEXT_EXTRACTION_MAX_ATTEMPTS:
+        status, delay = "pending", TEXT_EXTRACTION_RETRY_DELAY * 2 ** (attempts - 1)
+    else:
+        status, delay = "failed", 0
+    db.execute(text("""
+        UPDATE documents
+        SET text_status = :status, text_error = :error,
+            text_next_attempt_at = now() + make_interval(secs => :delay)
+        WHERE id = :id AND file_url = :file_url AND text_status = 'processing'
+    """), {"id": document_id, "file_url": file_url, "status": status, "error": error[:1000], "delay": delay})
+    db.commit()
+
+
+def process_next() -> bool:
+    """Extrai o texto de um documento da fila. Retorna False quando a fila está vazia."""
+    with SessionLocal() as db:
+        job = _claim(db)
+        db.commit()
+        if job is None:
+            return False
+
+        document_id, file_url, attempts = job
+        try:
+            with _download(object_name_from_url(file_url)) as fileobj:
+                full_text = extract_text(fileobj)
+        except PermanentExtractionError as e:
+            _fail(db, document_id, file_url, attempts, str(e), retry=False)
+            logger.warning("extração de texto do documento %s falhou: %s", document_id, e)
+            return True
+        except Exception as e:
+            _fail(db, document_id, file_url, attempts, f"{type(e).__name__}: {e}", retry=True)
+            logger.warning("extração de texto do documento %s falhou (tentativa %s): %s", document_id, attempts, e)
+            return True
+
+        if _finish(db, document_id, file_url, full_text):
+            # a busca passa a encontrar o documento pelo texto
+            invalidate_document_caches()
+        return True
+
+
+class TextExtractionPool:
+    """Threads que consomem a fila; wake() evita esperar o próximo ciclo de polling."""
+
+    def __init__(self, workers: int = TEXT_EXTRACTION_WORKERS):
+        self.workers = workers
+        self._threads: list[threading.Thread] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"text-extraction-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = process_next()
+            except Exception:
+                logger.exception("erro no worker de extração de texto")
+                processed = False
+            if not processed:
+                self._wake.wait(TEXT_EXTRACTION_POLL)
+                self._wake.clear()
+
+
+text_extraction_pool = TextExtractionPool()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Workers de extração de texto dos PDFs")
+    parser.add_argument("--workers", type=int, default=max(TEXT_EXTRACTION_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool = TextExtractionPool(args.workers)
+    pool.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pool.stop()
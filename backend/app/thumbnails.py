@@ -0,0 +1,146 @@
+"""
+Miniaturas da primeira página dos PDFs, guardadas no bucket ao lado do arquivo
+(`<objeto>.thumb.jpg`).
+
+São geradas em segundo plano logo após o upload e, se ainda não existirem quando forem
+pedidas, na própria requisição. Requisições simultâneas pela mesma miniatura geram a
+imagem uma única vez (SingleFlight).
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pypdfium2 as pdfium  # o render usa o Pillow (to_pil)
+
+from app.cache import SingleFlight, TTLCache
+from app.minio_client import client, BUCKET
+from app.storage import ObjectTooLarge, download_object, is_missing_object
+
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "320"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+THUMBNAIL_MAX_BYTES = int(os.getenv("THUMBNAIL_MAX_BYTES", str(100 * 1024 * 1024)))
+THUMBNAIL_SUFFIX = ".thumb.jpg"
+
+# gerações pendentes além dos workers; acima disso o upload não agenda (fica para o 1º acesso)
+MAX_QUEUED = THUMBNAIL_WORKERS * 16
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailUnavailable(Exception):
+    """O arquivo não existe ou não é um PDF que dê para renderizar."""
+
+
+def thumbnail_name(object_name: str) -> str:
+    return f"{object_name}{THUMBNAIL_SUFFIX}"
+
+
+# o PDFium não é thread-safe
+_pdfium_lock = threading.Lock()
+
+
+def render_thumbnail(fileobj) -> bytes:
+    with _pdfium_lock:
+        try:
+            pdf = pdfium.PdfDocument(fileobj)
+        except pdfium.PdfiumError as e:
+            raise ThumbnailUnavailable(f"PDF inválido: {e}")
+        try:
+            if len(pdf) == 0:
+                raise ThumbnailUnavailable("PDF sem páginas")
+            page = pdf[0]
+            image = page.render(scale=THUMBNAIL_WIDTH / page.get_width()).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+
+    image = image.convert("RGB")
+    # páginas muito compridas (faixas, pôsteres) são cortadas no dobro da largura
+    image = image.crop((0, 0, image.width, min(image.height, image.width * 2)))
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def _generate(object_name: str) -> bytes:
+    try:
+        with download_object(object_name, THUMBNAIL_MAX_BYTES) as fileobj:
+            data = render_thumbnail(fileobj)
+    except ObjectTooLarge as e:
+        raise ThumbnailUnavailable(str(e))
+    except Exception as e:
+        if is_missing_object(e):
+            raise ThumbnailUnavailable("arquivo não encontrado no armazenamento")
+        raise
+
+    client.put_object(
+        BUCKET, thumbnail_name(object_name), io.BytesIO(data), len(data),
+        content_type="image/jpeg",
+    )
+    return data
+
+
+_in_flight = SingleFlight()
+# arquivos que não renderizam: evita baixar o PDF de novo a cada pedido
+_unavailable = TTLCache(maxsize=4096, ttl=600)
+
+
+def generate_thumbnail(object_name: str) -> bytes:
+    """Gera (uma vez, mesmo com chamadas concorrentes) e grava a miniatura do objeto."""
+    reason = _unavailable.get(object_name)
+    if reason is not None:
+        raise ThumbnailUnavailable(reason)
+    try:
+        return _in_flight.do(object_name, _generate, object_name)
+    except ThumbnailUnavailable as e:
+        _unavailable.set(object_name, str(e))
+        raise
+
+
+def get_thumbnail(object_name: str):
+    """Retorna (bytes, etag) da miniatura, gerando-a se ainda não existir."""
+    try:
+        response = client.get_object(BUCKET, thumbnail_name(object_name))
+        try:
+            data = response.read()
+            etag = response.headers.get("ETag", "").strip('"')
+        finally:
+            response.close()
+            response.release_conn()
+        return data, etag
+    except Exception as e:
+        if not is_missing_object(e):
+            raise
+
+    data = generate_thumbnail(object_name)
+    return data, hashlib.md5(data).hexdigest()
+
+
+_executor = ThreadPoolExecutor(max_workers=max(THUMBNAIL_WORKERS, 1), thread_name_prefix="thumbnail")
+_queue_slots = threading.BoundedSemaphore(MAX_QUEUED)
+
+
+def _generate_in_background(object_name: str):
+    try:
+        generate_thumbnail(object_name)
+    except ThumbnailUnavailable:
+        pass
+    except Exception:
+        logger.exception("erro ao gerar a miniatura de %s", object_name)
+    finally:
+        _queue_slots.release()
+
+
+def schedule_thumbnail(object_name: str, content_type: str | None = None):
+    """Agenda a geração após o upload (só PDFs); se a fila estiver cheia, fica para o 1º acesso."""
+    if THUMBNAIL_WORKERS <= 0:
+        return
+    if content_type and content_type != "application/pdf" and not object_name.lower().endswith(".pdf"):
+        return
+    if not _queue_slots.acquire(blocking=False):
+        return
+    _executor.submit(_generate_in_background, object_name)
@@ -0,0 +1,112 @@
+"""
+Limpeza das sessões de upload abandonadas.
+
+Uma sessão não concluída em UPLOAD_SESSION_TTL_HOURS é descartada: o multipart upload é
+abortado no MinIO (senão as partes ficam ocupando espaço no bucket sem aparecer na
+listagem) e, no envio pré-assinado, o objeto eventualmente enviado vai para a fila de
+remoção. A linha fica, marcada como aborted, para que nenhum documento passe a usar o
+object_name. Sessões concluídas há mais tempo que isso só têm a linha apagada.
+
+Vários processos podem rodar a limpeza ao mesmo tempo (FOR UPDATE SKIP LOCKED):
+
+    python -m app.upload_sweeper
+"""
+import logging
+import os
+import threading
+
+from minio.error import S3Error
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.storage import abort_multipart_upload
+from app.storage_outbox import enqueue_removal, outbox_drainer
+
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+UPLOAD_SWEEP_INTERVAL = float(os.getenv("UPLOAD_SWEEP_INTERVAL", "3600"))
+UPLOAD_SWEEP_BATCH_SIZE = int(os.getenv("UPLOAD_SWEEP_BATCH_SIZE", "100"))
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_batch() -> int:
+    """Descarta um lote de sessões vencidas. Retorna quantas foram descartadas."""
+    with SessionLocal() as db:
+        rows = db.execute(text("""
+            SELECT id, object_name, upload_id FROM upload_sessions
+            WHERE NOT completed AND NOT aborted AND created_at < now() - make_interval(hours => :ttl)
+            ORDER BY created_at
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        """), {"ttl": UPLOAD_SESSION_TTL_HOURS, "limit": UPLOAD_SWEEP_BATCH_SIZE}).all()
+
+        swept, removals = [], []
+        for session_id, object_name, upload_id in rows:
+            if upload_id is None:
+                removals.append(object_name)
+            else:
+                try:
+                    abort_multipart_upload(object_name, upload_id)
+                except S3Error as e:
+                    if e.code != "NoSuchUpload":
+                        logger.warning("erro ao abortar o upload %s (%s): %s", session_id, object_name, e)
+                        continue  # a linha fica para a próxima passada
+            swept.append(session_id)
+
+        if removals:
+            enqueue_removal(db, removals)
+        if swept:
+            db.execute(text("UPDATE upload_sessions SET aborted = true WHERE id = ANY(:ids)"), {"ids": swept})
+        db.execute(text("""
+            DELETE FROM upload_sessions
+            WHERE completed AND created_at < now() - make_interval(hours => :ttl)
+        """), {"ttl": UPLOAD_SESSION_TTL_HOURS})
+        db.commit()
+
+    if removals:
+        outbox_drainer.wake()
+    return len(swept)
+
+
+class UploadSweeper:
+    """Thread que descarta as sessões vencidas a cada UPLOAD_SWEEP_INTERVAL segundos."""
+
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None or UPLOAD_SESSION_TTL_HOURS <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # lote cheio: provavelmente há mais sessões vencidas, não espera
+                if sweep_batch() >= UPLOAD_SWEEP_BATCH_SIZE:
+                    continue
+            except Exception:
+                logger.exception("erro ao descartar as sessões de upload vencidas")
+            self._stop.wait(UPLOAD_SWEEP_INTERVAL)
+
+
+upload_sweeper = UploadSweeper()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    total = 0
+    while swept := sweep_batch():
+        total += swept
+    print(f"{total} sessões de upload descartadas")
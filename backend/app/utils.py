@@ -1,3 +1,4 @@
+import hashlib
 import re
 import unicodedata
 import os
@@ -8,6 +9,14 @@ def get_public_url(object_name: str) -> str:
     """Retorna a URL pública de um objeto no MinIO."""
     return f"{PUBLIC_URL.rstrip('/')}/{object_name}"
 
+def object_name_from_url(url: str) -> str:
+    """Inverso de get_public_url: nome do objeto no bucket a partir da URL pública."""
+    prefix = f"{PUBLIC_URL.rstrip('/')}/"
+    if url.startswith(prefix):
+        return url[len(prefix):]
+    # URLs gravadas com outro host: http://host/bucket/objeto
+    return url.split("/", 4)[-1]
+
 def slugify_filename(filename: str) -> str:
     """Converte o nome do arquivo para um formato seguro (slug)."""
     # 1. Normaliza para ASCII (remove acentos: ç -> c, é -> e)
@@ -21,3 +30,15 @@ def slugify_filename(filename: str) -> str:
     filename = re.sub(r'[-\s]+', '-', filename).strip('-_')
     
     return filename.lower()
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Forma canônica de uma palavra-chave: sem acentos, minúscula e com espaços simples."""
+    keyword = unicodedata.normalize('NFKD', keyword)
+    keyword = ''.join(c for c in keyword if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', keyword).strip().lower()
+
+
+def thumbnail_version(file_url: str) -> str:
+    """Muda quando o arquivo do documento muda; vai na URL da miniatura para permitir cache imutável."""
+    return hashlib.sha1(file_url.encode()).hexdigest()[:12]
@@ -0,0 +1,14 @@
+"""
+Benchmark reprodutível da API.
+
+    python -m benchmarks.corpus --documents 20000 --reset   # gera o acervo sintético no Postgres
+    python -m benchmarks.run --output results/antes.json     # roda os cenários contra o app real
+    python -m benchmarks.compare results/antes.json results/depois.json
+    python -m benchmarks.plan_guard                          # falha se a listagem perder os índices
+    python -m benchmarks.query_budget                        # falha se um endpoint passar do orçamento de SQL
+    python -m pytest benchmarks                              # o mesmo orçamento como teste
+
+O MinIO é substituído por um armazenamento em memória (benchmarks.fake_storage), de modo
+que /files e /upload medem só o backend. Com --base-url os cenários rodam contra um
+servidor já em execução (aí o armazenamento é o real).
+"""
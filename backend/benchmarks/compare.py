@@ -0,0 +1,72 @@
+"""
+Compara dois resultados de benchmarks.run e mostra a variação de vazão e latência por
+cenário. Com --fail-on-regression, sai com código 1 se o p95 de algum cenário piorar mais
+que a porcentagem informada.
+
+    python -m benchmarks.compare antes.json depois.json --fail-on-regression 10
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before, after) -> float | None:
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, current: dict) -> dict:
+    rows = {}
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before = baseline["results"].get(name)
+        after = current["results"].get(name)
+        if before is None or after is None:
+            rows[name] = None
+            continue
+        rows[name] = {
+            metric: {"before": before[metric], "after": after[metric], "change": _change(before[metric], after[metric])}
+            for metric in METRICS
+        }
+    return rows
+
+
+def _format(value) -> str:
+    return "-" if value is None else f"{value:+.1f}%"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dois resultados do benchmark")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="falha se o p95 de algum cenário piorar mais que PCT%%")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    for side, data in (("antes", baseline), ("depois", current)):
+        meta = data.get("meta", {})
+        print(f"{side:<7} {meta.get('git_commit') or '?':.12} {meta.get('timestamp', '')} "
+              f"{meta.get('documents')} documentos, concorrência {meta.get('concurrency')}")
+    print()
+    print(f"{'cenário':<24} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+
+    regressions = []
+    for name, row in compare(baseline, current).items():
+        if row is None:
+            print(f"{name:<24} presente em apenas um dos resultados")
+            continue
+        print(f"{name:<24} " + " ".join(f"{_format(row[metric]['change']):>9}" for metric in METRICS))
+        change = row["p95_ms"]["change"]
+        if args.fail_on_regression is not None and change is not None and change > args.fail_on_regression:
+            regressions.append(f"{name}: p95 {row['p95_ms']['before']} -> {row['p95_ms']['after']} ms ({change:+.1f}%)")
+
+    if regressions:
+        print("\nRegressões acima do limite:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
@@ -0,0 +1,146 @@
+"""
+Gera um acervo sintético (cursos, eventos, orientadores e N documentos com autores e
+keywords) no Postgres configurado pelas variáveis POSTGRES_*.
+
+A geração é determinística para uma mesma --seed, então duas execuções produzem o mesmo
+acervo e os resultados do benchmark podem ser comparados.
+"""
+import argparse
+import json
+import random
+
+from sqlalchemy import text
+
+from app.bulk_import import import_documents
+from app.core.security import hash_password
+from app.models.course import Course
+from app.models.event import Event
+from app.models.user import User
+from app.utils import get_public_url
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+COURSES = [
+    "Ciência da Computação", "Engenharia Civil", "Engenharia Elétrica", "Engenharia Mecânica",
+    "Física", "Química", "Matemática", "Biologia", "Medicina", "Enfermagem", "Direito", "Administração",
+]
+EVENTS = [
+    ("LATS", "Latin American Test Symposium"), ("SBRC", "Simpósio Brasileiro de Redes de Computadores"),
+    ("SBBD", "Simpósio Brasileiro de Banco de Dados"), ("CBA", "Congresso Brasileiro de Automática"),
+    ("SEMIC", "Semana de Iniciação Científica"), ("ENEM-ENG", "Encontro Nacional de Engenharia"),
+    ("SBQ", "Reunião Anual da Sociedade Brasileira de Química"), ("CBMat", "Congresso Brasileiro de Matemática"),
+]
+TYPES = ["event", "symposium", "periodical", "thesis", "dissertation", "monograph"]
+FIELDS = [
+    "Computação", "Engenharia", "Ciências Exatas", "Ciências Biológicas", "Saúde",
+    "Ciências Sociais Aplicadas", "Ciências Humanas", "Educação",
+]
+FIRST_NAMES = [
+    "Ana", "João", "Maria", "Pedro", "Lucas", "Juliana", "Gabriel", "Fernanda", "Rafael", "Camila",
+    "Bruno", "Larissa", "Thiago", "Beatriz", "Mateus", "Letícia", "Felipe", "Mariana", "Gustavo", "Carolina",
+]
+LAST_NAMES = [
+    "Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Costa", "Ferreira", "Rodrigues", "Almeida",
+    "Nascimento", "Araújo", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Camargo", "Barbosa", "Moreira",
+]
+TITLE_WORDS = [
+    "análise", "aplicação", "modelo", "sistema", "avaliação", "estudo", "otimização", "redes",
+    "dados", "aprendizado", "máquina", "energia", "sustentável", "controle", "simulação", "algoritmos",
+    "desempenho", "estruturas", "materiais", "saúde", "educação", "ensino", "processos", "sensores",
+    "distribuído", "neural", "solo", "água", "proteínas", "células", "mercado", "gestão", "segurança",
+]
+KEYWORD_VOCABULARY_SIZE = 500
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _keyword_vocabulary(rng: random.Random) -> list[str]:
+    vocabulary = set()
+    while len(vocabulary) < KEYWORD_VOCABULARY_SIZE:
+        size = rng.choice((1, 2, 2, 3))
+        vocabulary.add(" ".join(rng.sample(TITLE_WORDS, size)).title())
+    return sorted(vocabulary)
+
+
+def _document_rows(rng, count, advisor_ids, course_ids, event_ids):
+    vocabulary = _keyword_vocabulary(rng)
+    # distribuição de Zipf: poucas keywords muito usadas, cauda longa de raras
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    for i in range(count):
+        title_words = rng.sample(TITLE_WORDS, rng.randint(4, 9))
+        abstract_words = [rng.choice(TITLE_WORDS) for _ in range(rng.randint(60, 200))]
+        yield json.dumps({
+            "title": " ".join(title_words).capitalize(),
+            "abstract": " ".join(abstract_words).capitalize() + ".",
+            "type": rng.choice(TYPES),
+            "field": rng.choice(FIELDS),
+            "publish_year": rng.randint(2000, 2025),
+            "event_id": rng.choice(event_ids) if rng.random() < 0.6 else None,
+            "course_id": rng.choice(course_ids),
+            "advisor_id": rng.choice(advisor_ids),
+            "file_url": get_public_url(f"bench/{i:07d}.pdf"),
+            "authors": [
+                {"name": _name(rng), "email": f"autor{rng.randint(1, 99999)}@example.com"}
+                for _ in range(rng.randint(1, 6))
+            ],
+            "keywords": list(set(rng.choices(vocabulary, weights=weights, k=rng.randint(2, 8)))),
+        }, ensure_ascii=False)
+
+
+def reset(db):
+    db.execute(text(
+        "TRUNCATE document_keywords, document_authors, keywords, documents, upload_sessions, "
+        "users, events, courses, similarity_queue RESTART IDENTITY CASCADE"
+    ))
+    db.commit()
+
+
+def generate(db, documents: int, advisors: int = 50, seed: int = 42, batch_size: int = 1000) -> dict:
+    rng = random.Random(seed)
+
+    courses = [Course(name=name) for name in COURSES]
+    events = [Event(code=code, name=name) for code, name in EVENTS]
+    db.add_all(courses + events)
+    db.flush()
+
+    password_hash = hash_password(BENCH_PASSWORD)  # um único hash: bcrypt é lento de propósito
+    users = [User(name="Benchmark", email=BENCH_EMAIL, password_hash=password_hash, course_id=courses[0].id)]
+    users += [
+        User(name=_name(rng), email=f"orientador{i}@example.com", password_hash=password_hash,
+             course_id=rng.choice(courses).id)
+        for i in range(advisors)
+    ]
+    db.add_all(users)
+    db.commit()
+
+    rows = _document_rows(
+        rng, documents, [u.id for u in users], [c.id for c in courses], [e.id for e in events]
+    )
+    report = import_documents(db, rows, "jsonl", batch_size)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return report
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Gera o acervo sintético do benchmark")
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--advisors", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--reset", action="store_true", help="apaga TODOS os dados das tabelas antes de gerar")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.reset:
+            reset(db)
+        report = generate(db, args.documents, args.advisors, args.seed, args.batch_size)
+
+    print(f"{report['inserted']} documentos inseridos, {report['failed']} com erro")
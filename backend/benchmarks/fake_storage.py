@@ -0,0 +1,152 @@
+import hashlib
+import io
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from minio.error import S3Error
+
+
+class _ObjectResponse:
+    """Imita o urllib3.HTTPResponse devolvido por Minio.get_object."""
+
+    def __init__(self, data: bytes, etag: str):
+        self._buffer = io.BytesIO(data)
+        self.headers = {"ETag": f'"{etag}"', "Content-Length": str(len(data))}
+
+    def read(self, amount=None):
+        return self._buffer.read(amount)
+
+    def stream(self, amount=64 * 1024):
+        while True:
+            chunk = self._buffer.read(amount)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """Armazenamento em memória com a parte da API do Minio usada pelo backend."""
+
+    def __init__(self):
+        self._objects: dict[str, dict] = {}
+        self._multipart: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _missing(self, object_name):
+        return S3Error("NoSuchKey", "Object does not exist", object_name, None, None, None)
+
+    def put_bytes(self, object_name: str, data: bytes, content_type="application/octet-stream"):
+        with self._lock:
+            self._objects[object_name] = {
+                "data": data,
+                "etag": hashlib.md5(data).hexdigest(),
+                "content_type": content_type,
+                "last_modified": datetime.now(timezone.utc),
+            }
+
+    # --- API do Minio ---
+
+    def put_object(self, bucket_name, object_name, data, length, content_type="application/octet-stream", **kwargs):
+        payload = data.read() if length < 0 else data.read(length)
+        self.put_bytes(object_name, payload, content_type)
+        return SimpleNamespace(object_name=object_name, etag=self._objects[object_name]["etag"])
+
+    def stat_object(self, bucket_name, object_name, **kwargs):
+        item = self._objects.get(object_name)
+        if item is None:
+            raise self._missing(object_name)
+        return SimpleNamespace(
+            object_name=object_name,
+            size=len(item["data"]),
+            etag=item["etag"],
+            content_type=item["content_type"],
+            last_modified=item["last_modified"],
+        )
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0, **kwargs):
+        item = self._objects.get(object_name)
+        if item is None:
+            raise self._missing(object_name)
+        data = item["data"]
+        end = offset + length if length else len(data)
+        return _ObjectResponse(data[offset:end], item["etag"])
+
+    def fget_object(self, bucket_name, object_name, file_path, **kwargs):
+        with open(file_path, "wb") as f:
+            f.write(self.get_object(bucket_name, object_name).read())
+
+    def remove_object(self, bucket_name, object_name, **kwargs):
+        with self._lock:
+            self._objects.pop(object_name, None)
+
+    def remove_objects(self, bucket_name, delete_object_list, **kwargs):
+        for delete_object in delete_object_list:
+            self.remove_object(bucket_name, delete_object._name)
+        return iter(())
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False, **kwargs):
+        for name in sorted(self._objects):
+            if prefix and not name.startswith(prefix):
+                continue
+            item = self._objects[name]
+            yield SimpleNamespace(
+                object_name=name,
+                size=len(item["data"]),
+                etag=item["etag"],
+                last_modified=item["last_modified"],
+                is_dir=False,
+            )
+
+    def presigned_get_object(self, bucket_name, object_name, **kwargs):
+        return f"http://fake-storage/{bucket_name}/{object_name}?X-Amz-Signature=fake"
+
+    def presigned_put_object(self, bucket_name, object_name, **kwargs):
+        return f"http://fake-storage/{bucket_name}/{object_name}?X-Amz-Signature=fake"
+
+    # --- multipart (métodos internos do SDK usados em app.storage) ---
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        upload_id = uuid.uuid4().hex
+        self._multipart[upload_id] = {
+            "object_name": object_name,
+            "content_type": headers.get("Content-Type", "application/octet-stream"),
+            "parts": {},
+        }
+        return upload_id
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        etag = hashlib.md5(data).hexdigest()
+        self._multipart[upload_id]["parts"][part_number] = (etag, data)
+        return etag
+
+    def _list_parts(self, bucket_name, object_name, upload_id, **kwargs):
+        parts = [
+            SimpleNamespace(part_number=number, etag=etag, size=len(data))
+            for number, (etag, data) in sorted(self._multipart[upload_id]["parts"].items())
+        ]
+        return SimpleNamespace(parts=parts, is_truncated=False, next_part_number_marker=None)
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        upload = self._multipart.pop(upload_id)
+        data = b"".join(upload["parts"][part.part_number][1] for part in parts)
+        self.put_bytes(object_name, data, upload["content_type"])
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self._multipart.pop(upload_id, None)
+
+
+def install() -> FakeMinio:
+    """Troca o cliente do MinIO pelo armazenamento em memória. Chamar antes de importar app.main."""
+    import app.minio_client
+
+    fake = FakeMinio()
+    app.minio_client.client = fake
+    return fake
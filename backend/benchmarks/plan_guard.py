@@ -0,0 +1,174 @@
+"""
+Guarda de regressão dos planos de consulta da listagem de documentos.
+
+Roda EXPLAIN (sem executar) da consulta de GET /documents para cada combinação dos filtros
+(q, type, publish_year, field, keyword, event_id), na primeira página e na página por
+cursor, e das cargas em lote de autores e keywords. Falha (código de saída 1) quando algum
+plano lê sequencialmente uma das tabelas grandes — sinal de que um índice sumiu ou de que
+um filtro novo não tem índice.
+
+    python -m benchmarks.corpus --documents 20000 --reset   # ou --generate abaixo
+    python -m benchmarks.plan_guard
+    python -m benchmarks.plan_guard --generate 20000        # apaga os dados e gera o acervo
+
+Os valores dos filtros são tirados do próprio banco, então o acervo precisa ter volume
+(--min-rows): em tabelas pequenas o Postgres prefere, com razão, a leitura sequencial.
+As contagens (total=exact) e as facetas não entram: sem filtro elas leem tudo de qualquer
+forma.
+"""
+import argparse
+import itertools
+import re
+import sys
+
+from sqlalchemy import func, select, text
+
+from app.crud.document import DOCUMENT_LOAD_OPTIONS, DocumentFilters, encode_cursor, explain, page_statement
+from app.models.document import Document
+from app.models.document_author import DocumentAuthor
+from app.models.document_keyword import DocumentKeyword
+from app.search import SEARCH_CONFIGS
+
+LARGE_TABLES = ("documents", "document_authors", "document_keywords")
+FILTERS = ("q", "type", "publish_year", "field", "keyword", "event_id")
+PAGE_SIZE = 20
+
+
+def search_term(db, title: str) -> str:
+    """A palavra mais longa do título que não é stopword (uma stopword vira tsquery vazia)."""
+    words = sorted(dict.fromkeys(re.findall(r"\w+", title)), key=len, reverse=True)
+    for word in words:
+        lexemes = db.execute(
+            select(func.numnode(func.plainto_tsquery(text(f"'{SEARCH_CONFIGS[0]}'::regconfig"), word)))
+        ).scalar_one()
+        if lexemes:
+            return word
+    return words[0] if words else title
+
+
+def sample_values(db) -> dict:
+    """Um valor realista para cada filtro, tirado dos dados."""
+    title = db.execute(select(Document.title).order_by(Document.id).limit(1)).scalar_one()
+    years = db.execute(
+        select(Document.publish_year).group_by(Document.publish_year)
+        .order_by(Document.publish_year.desc()).limit(2)
+    ).scalars().all()
+    field = db.execute(
+        select(Document.field).where(Document.field.is_not(None)).group_by(Document.field)
+        .order_by(func.count().desc()).limit(1)
+    ).scalar()
+    # keyword de frequência média: nem a mais comum nem uma que não aparece
+    keyword = db.execute(
+        select(DocumentKeyword.keyword).group_by(DocumentKeyword.keyword)
+        .order_by(func.count().desc()).offset(10).limit(1)
+    ).scalar()
+    event_id = db.execute(
+        select(Document.event_id).where(Document.event_id.is_not(None)).group_by(Document.event_id)
+        .order_by(func.count().desc()).limit(1)
+    ).scalar()
+    type_ = db.execute(
+        select(Document.type).group_by(Document.type).order_by(func.count().desc()).limit(1)
+    ).scalar_one()
+
+    return {
+        "q": search_term(db, title),
+        "type": [type_],
+        "publish_year": list(years),
+        # trecho do meio da palavra: o ILIKE '%...%' não tem como usar um btree
+        "field": [field[1:8]] if field else [],
+        "keyword": [keyword] if keyword else [],
+        "event_id": [event_id] if event_id is not None else [],
+    }
+
+
+def table_sizes(db) -> dict[str, float]:
+    rows = db.execute(
+        text("SELECT relname, reltuples FROM pg_class WHERE relname = ANY(:names) AND relkind = 'r'"),
+        {"names": list(LARGE_TABLES)},
+    ).all()
+    return {name: reltuples for name, reltuples in rows}
+
+
+def seq_scans(plan: dict):
+    """Nós Seq Scan do plano (inclusive os paralelos), percorrendo a árvore."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def statements(values: dict):
+    """(nome, statement) de cada consulta verificada."""
+    for size in range(len(FILTERS) + 1):
+        for combo in itertools.combinations(FILTERS, size):
+            if any(not values[name] for name in combo):
+                continue  # acervo sem esse valor (ex.: nenhum evento)
+            filters = DocumentFilters(**{
+                name: values[name] if name in combo else ([] if name != "q" else None)
+                for name in FILTERS
+            })
+            statement = filters.apply(select(Document).options(*DOCUMENT_LOAD_OPTIONS))
+            sort_key = filters.sort_key()
+            label = "+".join(combo) or "(sem filtros)"
+
+            yield f"{label} / página 1", page_statement(statement, sort_key, PAGE_SIZE)
+            # cursor típico do meio da listagem (rank em busca textual, ano nas demais)
+            cursor = encode_cursor(0.05 if filters.tsquery is not None else max(values["publish_year"]), 10 ** 9)
+            yield f"{label} / cursor", page_statement(statement, sort_key, PAGE_SIZE, after=cursor)
+
+    ids = list(range(1, PAGE_SIZE + 1))
+    yield "selectin autores", select(DocumentAuthor).where(DocumentAuthor.document_id.in_(ids))
+    yield "selectin keywords", select(DocumentKeyword).where(DocumentKeyword.document_id.in_(ids))
+
+
+def check(db, min_rows: float, verbose: bool = False) -> list[str]:
+    sizes = table_sizes(db)
+    large = {name for name, rows in sizes.items() if rows >= min_rows}
+    small = sorted(set(LARGE_TABLES) - large)
+    if small:
+        print(f"aviso: tabelas com menos de {min_rows:.0f} linhas não são verificadas: {', '.join(small)}",
+              file=sys.stderr)
+
+    values = sample_values(db)
+    failures = []
+    for name, statement in statements(values):
+        plan = explain(db, statement)
+        offending = [node["Relation Name"] for node in seq_scans(plan) if node.get("Relation Name") in large]
+        status = "FALHA" if offending else "ok"
+        line = f"{status:5}  {name}  (custo {plan['Total Cost']:.0f})"
+        if offending:
+            line += f"  Seq Scan em {', '.join(offending)}"
+            failures.append(line)
+        if offending or verbose:
+            print(line)
+
+    db.rollback()
+    return failures
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Falha se a listagem de documentos ler tabelas grandes por inteiro")
+    parser.add_argument("--min-rows", type=float, default=10000,
+                        help="tabelas com menos linhas que isso podem ser lidas sequencialmente")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="apaga TODOS os dados das tabelas e gera um acervo sintético de N documentos")
+    parser.add_argument("--verbose", action="store_true", help="imprime também as consultas aprovadas")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.generate:
+            from benchmarks import corpus
+
+            corpus.reset(db)
+            corpus.generate(db, args.generate)
+        for table in LARGE_TABLES:
+            db.execute(text(f"ANALYZE {table}"))
+        db.commit()
+
+        failures = check(db, args.min_rows, args.verbose)
+
+    print(f"{len(failures)} consulta(s) com leitura sequencial de tabela grande")
+    sys.exit(1 if failures else 0)
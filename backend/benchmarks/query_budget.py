@@ -0,0 +1,204 @@
+"""
+Orçamento de consultas por endpoint: conta os statements SQL e as linhas lidas durante
+uma requisição e falha quando o limite é excedido.
+
+`query_budget(...)` pode ser usado em testes; rodando o módulo, cada endpoint de
+default_budgets() é chamado contra o banco configurado e o processo sai com código 1 se algum
+estourar o orçamento:
+
+    python -m benchmarks.query_budget
+    QUERY_BUDGET_TOKEN=<jwt> python -m benchmarks.query_budget   # inclui rotas autenticadas
+
+O mesmo cheque roda no pytest (benchmarks/test_query_budget.py; pulado sem banco).
+
+Só conta o SQL executado no contexto da requisição medida (ContextVar): as threads de
+segundo plano não entram na conta. O app é chamado sem lifespan, então elas nem sobem.
+"""
+import asyncio
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# contador da requisição em andamento; SQL de outros contextos (workers) é ignorado
+_current_counter: ContextVar["QueryCounter | None"] = ContextVar("query_counter", default=None)
+
+
+def _rows_fetched(cursor) -> int:
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount is not None and rowcount >= 0:
+        return rowcount
+    # o adaptador asyncpg do SQLAlchemy não preenche rowcount em SELECT,
+    # mas mantém as linhas já buscadas em _rows
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else 0
+
+
+class QueryCounter:
+    """
+    Conta statements e linhas lidas nas engines informadas enquanto o contexto está ativo,
+    só no contexto (task/thread) que entrou nele e nos que ele criar.
+    """
+
+    def __init__(self, *engines):
+        self.engines = engines
+        self.statements = 0
+        self.rows = 0
+        self.sql: list[str] = []
+        self._lock = threading.Lock()
+        self._token = None
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_counter.get() is not self:
+            return
+        with self._lock:
+            self.statements += 1
+            self.sql.append(statement)
+            if cursor.description is not None:
+                self.rows += _rows_fetched(cursor)
+
+    def __enter__(self):
+        self._token = _current_counter.set(self)
+        for engine in self.engines:
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self.engines:
+            event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        _current_counter.reset(self._token)
+
+
+def _default_engines():
+    from app.database import engine, async_engine
+    return (engine, async_engine.sync_engine)
+
+
+@contextmanager
+def query_budget(max_statements: int, max_rows: int | None = None, engines=None):
+    """Levanta QueryBudgetExceeded se o bloco executar mais statements/linhas que o permitido."""
+    counter = QueryCounter(*(engines or _default_engines()))
+    with counter:
+        yield counter
+
+    if counter.statements > max_statements:
+        raise QueryBudgetExceeded(
+            f"{counter.statements} statements (máximo {max_statements}):\n" + "\n---\n".join(counter.sql)
+        )
+    if max_rows is not None and counter.rows > max_rows:
+        raise QueryBudgetExceeded(f"{counter.rows} linhas lidas (máximo {max_rows})")
+
+
+def document_rows(payload) -> int:
+    """
+    Linhas esperadas para carregar os documentos da resposta sem produto cartesiano:
+    1 por documento + 1 por autor + 1 por keyword (to-one vêm no mesmo JOIN).
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("documents", [payload])
+    return sum(1 + len(d.get("authors", [])) + len(d.get("keywords", [])) for d in payload)
+
+
+@dataclass
+class EndpointBudget:
+    name: str
+    path: str
+    max_statements: int
+    rows_from_payload: bool = False  # limite de linhas = document_rows(resposta)
+    extra_rows: int = 0
+    authenticated: bool = False
+
+
+def default_budgets(document_ids: list[int]) -> list[EndpointBudget]:
+    sample_id = document_ids[0] if document_ids else 0
+    batch = "&".join(f"ids={document_id}" for document_id in document_ids[:50]) or "ids=0"
+    return [
+        EndpointBudget("GET /documents", "/documents?limit=50", 3, rows_from_payload=True),
+        EndpointBudget("GET /documents (total)", "/documents?limit=50&total=exact", 4, rows_from_payload=True, extra_rows=1),
+        EndpointBudget("GET /documents (busca)", "/documents?limit=50&q=dados", 3, rows_from_payload=True),
+        EndpointBudget("GET /documents/{id}", f"/documents/{sample_id}", 3, rows_from_payload=True),
+        EndpointBudget("GET /documents/batch", f"/documents/batch?{batch}", 3, rows_from_payload=True),
+        EndpointBudget("GET /documents/facets", "/documents/facets", 1),
+        EndpointBudget("GET /documents/my-publications", "/documents/my-publications?limit=50", 4,
+                       rows_from_payload=True, extra_rows=1, authenticated=True),
+        EndpointBudget("GET /event", "/event", 1),
+        EndpointBudget("GET /course", "/course", 1),
+        EndpointBudget("GET /keywords", "/keywords", 1),
+    ]
+
+
+async def run(budgets=None, token: str | None = None) -> list[str]:
+    """Chama cada endpoint com os caches limpos e retorna a lista de falhas."""
+    import httpx
+    from sqlalchemy import select
+
+    from app.catalog import invalidate_catalog
+    from app.crud.document import invalidate_document_caches
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.document import Document
+
+    if budgets is None:
+        with SessionLocal() as db:
+            ids = db.execute(select(Document.id).order_by(Document.id).limit(50)).scalars().all()
+        budgets = default_budgets(ids)
+
+    failures = []
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    # ASGITransport não dispara o lifespan: os workers de segundo plano não sobem
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://query-budget") as client:
+        # abre as conexões antes de medir (a inicialização do dialeto também executa SQL)
+        await client.get("/documents?limit=1")
+
+        for budget in budgets:
+            if budget.authenticated and not token:
+                print(f"{budget.name:<40} ignorado (sem QUERY_BUDGET_TOKEN)")
+                continue
+
+            invalidate_document_caches()
+            for key in ("event", "course", "keywords"):
+                invalidate_catalog(key)
+            if budget.authenticated:
+                # aquece o cache de autenticação para medir só a rota
+                await client.get("/me", headers=headers)
+
+            with QueryCounter(*_default_engines()) as counter:
+                response = await client.get(budget.path, headers=headers)
+
+            max_rows = None
+            if budget.rows_from_payload and response.status_code == 200:
+                max_rows = document_rows(response.json()) + budget.extra_rows
+
+            status = "ok"
+            if response.status_code >= 400:
+                status = f"HTTP {response.status_code}"
+            elif counter.statements > budget.max_statements:
+                status = f"{counter.statements} statements > {budget.max_statements}"
+            elif max_rows is not None and counter.rows > max_rows:
+                status = f"{counter.rows} linhas > {max_rows}"
+
+            print(f"{budget.name:<40} {counter.statements:>3} statements {counter.rows:>7} linhas  {status}")
+            if status != "ok":
+                failures.append(f"{budget.name}: {status}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    failures = asyncio.run(run(token=os.getenv("QUERY_BUDGET_TOKEN")))
+    if failures:
+        print("\nOrçamento excedido:\n  " + "\n  ".join(failures))
+        sys.exit(1)
@@ -0,0 +1,261 @@
+"""
+Roda os cenários do benchmark com clientes concorrentes e grava p50/p95/p99 e vazão por
+cenário em JSON (comparável com benchmarks.compare).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+# o app.minio_client exige as variáveis do MinIO mesmo quando ele é substituído
+for name, default in (
+    ("MINIO_ENDPOINT", "http://localhost:9000"),
+    ("MINIO_ACCESS_KEY", "minioadmin"),
+    ("MINIO_SECRET_KEY", "minioadmin"),
+    ("MINIO_BUCKET", "cientific-repository"),
+):
+    os.environ.setdefault(name, default)
+
+import httpx
+
+from benchmarks.corpus import BENCH_EMAIL, BENCH_PASSWORD
+
+PDF_SIZE = 1024 * 1024
+SEEDED_FILES = 200
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: object  # (rng, ctx) -> (method, url, kwargs)
+    authenticated: bool = False
+
+
+@dataclass
+class Result:
+    latencies: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, max(0, round(p / 100 * len(latencies)) - 1))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "throughput_rps": round(len(latencies) / self.elapsed, 2) if self.elapsed else 0,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+        }
+
+
+def _fake_pdf(index: int) -> bytes:
+    header = f"%PDF-1.4\n% benchmark {index}\n".encode()
+    return header + bytes(PDF_SIZE - len(header))
+
+
+def scenarios() -> list[Scenario]:
+    return [
+        Scenario("documents", lambda rng, ctx: ("GET", "/documents?limit=20", {})),
+        Scenario("documents_search", lambda rng, ctx: ("GET", "/documents", {
+            "params": {"q": rng.choice(ctx["words"]), "limit": 20}})),
+        Scenario("documents_filters", lambda rng, ctx: ("GET", "/documents", {
+            "params": {"type": rng.choice(ctx["types"]), "publish_year": rng.choice(ctx["years"]), "limit": 20}})),
+        Scenario("documents_keyword", lambda rng, ctx: ("GET", "/documents", {
+            "params": {"keyword": rng.choice(ctx["keywords"]), "limit": 20}})),
+        Scenario("documents_deep_offset", lambda rng, ctx: ("GET", "/documents", {
+            "params": {"limit": 20, "offset": ctx["deep_offset"]}})),
+        Scenario("documents_deep_cursor", lambda rng, ctx: ("GET", "/documents", {
+            "params": {"limit": 20, "after": ctx["deep_cursor"]}})),
+        Scenario("documents_facets", lambda rng, ctx: ("GET", "/documents/facets", {
+            "params": {"type": rng.choice(ctx["types"])}})),
+        Scenario("document_detail", lambda rng, ctx: ("GET", f"/documents/{rng.choice(ctx['ids'])}", {})),
+        Scenario("files", lambda rng, ctx: ("GET", f"/files/{rng.choice(ctx['files'])}", {})),
+        Scenario("files_range", lambda rng, ctx: ("GET", f"/files/{rng.choice(ctx['files'])}", {
+            "headers": {"Range": "bytes=0-65535"}})),
+        Scenario("upload", lambda rng, ctx: ("POST", "/upload", {
+            "files": {"file": ("bench.pdf", ctx["upload_body"], "application/pdf")}}), authenticated=True),
+        Scenario("login", lambda rng, ctx: ("POST", "/login", {
+            "json": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}})),
+    ]
+
+
+def load_context(fake_storage) -> dict:
+    """Lê do banco os valores usados para montar as requisições e popula o armazenamento falso."""
+    from sqlalchemy import distinct, select
+
+    from app.database import SessionLocal
+    from app.models.document import Document
+    from app.models.keyword import Keyword
+
+    with SessionLocal() as db:
+        ids = db.execute(select(Document.id).order_by(Document.id).limit(5000)).scalars().all()
+        types = db.execute(select(distinct(Document.type))).scalars().all()
+        years = db.execute(select(distinct(Document.publish_year))).scalars().all()
+        keywords = db.execute(
+            select(Keyword.name).order_by(Keyword.document_count.desc()).limit(100)
+        ).scalars().all()
+        urls = db.execute(select(Document.file_url).order_by(Document.id).limit(SEEDED_FILES)).scalars().all()
+        total = db.query(Document).count()
+
+    if not ids:
+        sys.exit("Acervo vazio: rode `python -m benchmarks.corpus` antes.")
+
+    files = [url.split("/", 4)[-1] for url in urls]
+    if fake_storage is not None:
+        for index, object_name in enumerate(files):
+            fake_storage.put_bytes(object_name, _fake_pdf(index), "application/pdf")
+
+    return {
+        "ids": ids,
+        "types": types,
+        "years": years,
+        "keywords": keywords or ["dados"],
+        "words": ["dados", "energia", "redes", "aprendizado", "sistema", "saude", "educacao"],
+        "files": files,
+        "deep_offset": max(0, total - 40),
+        "deep_cursor": None,
+        "upload_body": _fake_pdf(0)[:256 * 1024],
+        "documents": total,
+    }
+
+
+async def _deep_cursor(client, ctx, pages: int) -> str | None:
+    """Percorre `pages` páginas para obter um cursor de página profunda."""
+    cursor = None
+    for _ in range(pages):
+        params = {"limit": 20}
+        if cursor:
+            params["after"] = cursor
+        response = await client.get("/documents", params=params)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    return cursor
+
+
+async def run_scenario(client, scenario, ctx, headers, concurrency, duration, seed) -> Result:
+    result = Result()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            method, url, kwargs = scenario.build(rng, ctx)
+            if scenario.authenticated:
+                kwargs = {**kwargs, "headers": {**kwargs.get("headers", {}), **headers}}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+            result.latencies.append(time.perf_counter() - start)
+            status = str(response.status_code)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+            if response.status_code >= 500:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    if args.base_url:
+        transport, base_url, fake_storage = None, args.base_url, None
+    else:
+        from benchmarks import fake_storage as fake_storage_module
+
+        fake_storage = fake_storage_module.install()
+        from app.main import app
+
+        transport, base_url = httpx.ASGITransport(app=app), "http://bench"
+
+    ctx = load_context(fake_storage)
+    selected = [s for s in scenarios() if not args.scenario or s.name in args.scenario]
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits) as client:
+        login = await client.post("/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        ctx["deep_cursor"] = await _deep_cursor(client, ctx, args.cursor_pages)
+
+        results = {}
+        for scenario in selected:
+            if scenario.name == "documents_deep_cursor" and not ctx["deep_cursor"]:
+                continue
+            # aquecimento: conexões, caches e compilação de queries
+            await run_scenario(client, scenario, ctx, headers, args.concurrency, args.warmup, args.seed)
+            result = await run_scenario(client, scenario, ctx, headers, args.concurrency, args.duration, args.seed)
+            results[scenario.name] = result.summary()
+            summary = results[scenario.name]
+            print(
+                f"{scenario.name:<24} {summary['throughput_rps']:>9} req/s  "
+                f"p50 {summary['p50_ms']} ms  p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms  "
+                f"erros {summary['errors']}"
+            )
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "mode": "http" if args.base_url else "in-process",
+            "documents": ctx["documents"],
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Benchmark da API do portal")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por cenário")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--cursor-pages", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", help="roda só os cenários informados")
+    parser.add_argument("--base-url", help="servidor já em execução (usa o MinIO real)")
+    parser.add_argument("--output", help="arquivo JSON de resultado")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""
+Orçamento de consultas como teste: falha se algum endpoint de default_budgets() passar do
+número de statements ou de linhas permitido (N+1, produto cartesiano).
+
+Precisa do Postgres configurado (DB_*) com o schema migrado e algum acervo; sem banco ou
+sem documentos o teste é pulado. Rotas autenticadas entram com QUERY_BUDGET_TOKEN.
+
+    cd backend && python -m pytest benchmarks/test_query_budget.py
+"""
+import asyncio
+import os
+
+import pytest
+
+# o app.minio_client exige as variáveis do MinIO mesmo quando ele não é usado
+for name, default in (
+    ("MINIO_ENDPOINT", "http://localhost:9000"),
+    ("MINIO_ACCESS_KEY", "minioadmin"),
+    ("MINIO_SECRET_KEY", "minioadmin"),
+    ("MINIO_BUCKET", "cientific-repository"),
+):
+    os.environ.setdefault(name, default)
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+
+@pytest.fixture(scope="module")
+def database():
+    from app.database import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.document import Document
+
+    try:
+        with SessionLocal() as db:
+            has_documents = db.execute(sqlalchemy.select(Document.id).limit(1)).first() is not None
+    except sqlalchemy.exc.OperationalError as e:
+        pytest.skip(f"banco indisponível: {e}")
+    if not has_documents:
+        pytest.skip("acervo vazio: rode `python -m benchmarks.corpus` antes")
+
+
+def test_endpoints_within_query_budget(database):
+    from benchmarks.query_budget import run
+
+    failures = asyncio.run(run(token=os.getenv("QUERY_BUDGET_TOKEN")))
+    assert not failures, "orçamento de consultas excedido:\n" + "\n".join(failures)